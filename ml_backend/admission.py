@@ -0,0 +1,170 @@
+import ctypes
+import math
+import multiprocessing
+import os
+import time
+from contextlib import contextmanager
+
+# Single-core fit of training time and peak memory of the full model zoo on
+# numeric data (500-10000 rows, 10-100 columns). Memory is dominated by
+# per-row model state (forest trees, the SVM kernel cache) plus a dozen
+# float64 copies of the data across preprocessing and feature views.
+SECONDS_FIXED = 1.5
+SECONDS_PER_ROW = 1.8e-3
+SECONDS_PER_CELL = 2.2e-5
+BYTES_FIXED = 32 * 2**20
+BYTES_PER_ROW = 28 * 2**10
+DATA_COPIES = 12
+ZOO_SIZE = 8
+
+
+def estimate_training_cost(n_rows, n_columns, n_models=ZOO_SIZE, cv_folds=None, tuning_budget=0):
+    """Rough CPU seconds and peak bytes of one training job, from its row and column counts"""
+    model_share = n_models / ZOO_SIZE
+    seconds = SECONDS_FIXED + model_share * (SECONDS_PER_ROW * n_rows + SECONDS_PER_CELL * n_rows * n_columns)
+    if cv_folds:
+        # k folds, each fitting on (k-1)/k of the rows
+        seconds *= cv_folds - 1
+    seconds += tuning_budget
+    memory = BYTES_FIXED + model_share * BYTES_PER_ROW * n_rows + DATA_COPIES * 8 * n_rows * n_columns
+    return {'cpu_seconds': seconds, 'memory_bytes': int(memory)}
+
+
+def physical_memory():
+    """Total RAM in bytes where the platform reports it, else None"""
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+class QueueFull(Exception):
+    """Raised when a job arrives with the wait queue already full"""
+
+    def __init__(self, retry_after):
+        super().__init__(f'Training queue is full; retry in {retry_after} s')
+        self.retry_after = retry_after
+
+
+class Job(ctypes.Structure):
+    """A running or waiting job in the shared tables; pid 0 marks a free entry"""
+    _fields_ = [('pid', ctypes.c_int), ('ticket', ctypes.c_long), ('cpu_seconds', ctypes.c_double),
+                ('memory_bytes', ctypes.c_double), ('started', ctypes.c_double)]
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class AdmissionController:
+    """Admit training jobs under a concurrency limit and a memory budget, queueing the rest in order.
+
+    A job runs once it is first in the queue, fewer than `max_concurrent` jobs
+    are running and its estimated memory fits the budget next to theirs (a
+    job larger than the whole budget runs alone). Jobs arriving while
+    `max_queue` are already waiting raise QueueFull with a Retry-After
+    estimate: the remaining estimated CPU time ahead, spread over the slots.
+
+    The running and waiting jobs live in shared memory under a
+    multiprocessing condition, so the limits hold across every process
+    forked after the controller is created (prefork workers) as well as
+    across threads. Entries of a process that died are dropped.
+    """
+
+    def __init__(self, max_concurrent=2, max_queue=8, memory_budget=None):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.memory_budget = memory_budget
+        self.running = multiprocessing.RawArray(Job, max_concurrent)
+        self.waiting = multiprocessing.RawArray(Job, max(1, max_queue))
+        self.counters = multiprocessing.RawArray(ctypes.c_long, 3)  # next ticket, admitted, rejected
+        self.condition = multiprocessing.Condition()
+
+    @contextmanager
+    def admit(self, cost):
+        """Hold a training slot for the body of the with block, waiting in line for it if needed"""
+        with self.condition:
+            self._reap()
+            queued = [job for job in self.waiting if job.pid]
+            free = [job for job in self.waiting if not job.pid]
+            if len(queued) >= self.max_queue or not free:
+                self.counters[2] += 1
+                raise QueueFull(self.retry_after())
+            ticket = self.counters[0]
+            self.counters[0] += 1
+            entry = free[0]
+            self._fill(entry, ticket, cost, 0.0)
+            try:
+                while not self._can_start(ticket, cost):
+                    # Time out now and then to notice jobs of processes that died
+                    self.condition.wait(1.0)
+                    self._reap()
+            finally:
+                entry.pid = 0
+                # The next job in line may be able to start alongside this one
+                self.condition.notify_all()
+            slot = next(job for job in self.running if not job.pid)
+            self._fill(slot, ticket, cost, time.monotonic())
+            self.counters[1] += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                slot.pid = 0
+                self.condition.notify_all()
+
+    @staticmethod
+    def _fill(job, ticket, cost, started):
+        job.ticket = ticket
+        job.cpu_seconds = cost['cpu_seconds']
+        job.memory_bytes = cost['memory_bytes']
+        job.started = started
+        job.pid = os.getpid()
+
+    def _reap(self):
+        for job in list(self.running) + list(self.waiting):
+            if job.pid and not process_alive(job.pid):
+                job.pid = 0
+                self.condition.notify_all()
+
+    def _can_start(self, ticket, cost):
+        running = [job for job in self.running if job.pid]
+        first = min(job.ticket for job in self.waiting if job.pid)
+        if first != ticket or len(running) >= self.max_concurrent:
+            return False
+        if self.memory_budget is None or not running:
+            return True
+        return self._memory_in_use() + cost['memory_bytes'] <= self.memory_budget
+
+    def _memory_in_use(self):
+        return int(sum(job.memory_bytes for job in self.running if job.pid))
+
+    def retry_after(self):
+        """Estimated seconds until the current queue has drained, rounded up"""
+        now = time.monotonic()
+        remaining = sum(max(0.0, job.cpu_seconds - (now - job.started)) for job in self.running if job.pid)
+        remaining += sum(job.cpu_seconds for job in self.waiting if job.pid)
+        return max(1, math.ceil(remaining / self.max_concurrent))
+
+    def stats(self):
+        with self.condition:
+            self._reap()
+            running = sum(1 for job in self.running if job.pid)
+            queued = sum(1 for job in self.waiting if job.pid)
+            return {
+                'running': running,
+                'queued': queued,
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'memory_in_use': self._memory_in_use(),
+                'memory_budget': self.memory_budget,
+                'estimated_wait_seconds': self.retry_after() if running or queued else 0,
+                'admitted': self.counters[1],
+                'rejected': self.counters[2]
+            }
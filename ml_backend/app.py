@@ -1,42 +1,101 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify
 from flask_cors import CORS
 import pandas as pd
 import numpy as np
-import json
 import os
 import io
-import base64
-from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, VotingClassifier
-from sklearn.neural_network import MLPClassifier
-from sklearn.svm import SVC
-from sklearn.linear_model import LogisticRegression
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score, classification_report
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-import xgboost as xgb
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
+import time
+import json
+import hashlib
+import argparse
+import importlib
+from pipeline import Pipeline
+from serialization import NumpyJSONProvider
+from responses import compress_response, conditional_json
+from charts import chart_data, performance_figure
+from sessions import SessionStore, deep_nbytes
+from admission import AdmissionController, QueueFull, estimate_training_cost, physical_memory
+# scikit-learn, xgboost and the modules built on them are imported by the methods that
+# use them, so the server starts (and answers health checks) before they are loaded
+PRELOAD_MODULES = [
+    'sklearn.ensemble', 'sklearn.calibration', 'sklearn.kernel_approximation', 'sklearn.pipeline',
+    'sklearn.neural_network', 'sklearn.svm', 'sklearn.linear_model', 'sklearn.tree', 'sklearn.neighbors',
+    'sklearn.model_selection', 'sklearn.preprocessing', 'xgboost', 'scipy.sparse',
+    'xgboost_fast', 'evaluation', 'forest', 'neural', 'neighbors', 'linear', 'features', 'column_types',
+    'selection', 'parallel', 'tuning', 'checkpoints'
+]
 import warnings
 warnings.filterwarnings('ignore')
 
 app = Flask(__name__)
-CORS(app)
+app.json = NumpyJSONProvider(app)
+app.after_request(compress_response)
+CORS(app, expose_headers=["ETag"])
 
 class HybridMLSystem:
     def __init__(self):
         self.models = {}
-        self.scaler = StandardScaler()
+        # FeatureViews fits a fresh StandardScaler when none is given
+        self.scaler = None
         self.label_encoders = {}
         self.results = {}
         self.dataset_info = {}
+        # Weak ETags of dataset_info, results and charts: the pipeline cache keys they were computed under
+        self.etags = {}
+        self.charts = None
+        self.oof_predictions = {}
+        self.categorical_features = []
+        self.feature_extraction = True
+        self.column_types = {}
+        # Opt-in: benchmarks/bench_xgboost.py shows early stopping on a held-out split costing accuracy at every size
+        self.xgboost_fast_path = False
+        self.model_variants = {}
+        self.forest_mode = 'fixed'
+        self.nn_mode = 'fixed'
+        self.nn_float32 = False
+        self.knn_mode = 'fixed'
+        self.knn_k_max = 25
+        self.lr_mode = 'fixed'
+        self.model_inputs = {}
+        self.model_selection = None
+        self.feature_selection = 'univariate'
+        self.max_features = 50
+        self.selection_report = None
+        self.sparse_mode = False
+        self.pca_mode = 'off'
+        self.pca_variance = 0.95
+        self.pca_components = 50
+        self.feature_views = None
+        # Row (and feature) counts above which scalable substitutes replace the default estimators
+        self.size_thresholds = {
+            'gradient_boosting': 10000,
+            'svm_kernel_approx': 5000,
+            'svm_linear': 50000,
+            'knn_tree': 10000,
+            'pca_features': 20
+        }
+        self.trial_cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'tuning')
+        self.trial_cache = None
+        # Fitted models are checkpointed per run here, so an interrupted or resubmitted run trains only what is missing
+        self.checkpointing = True
+        self.checkpoint_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'runs')
+        self.checkpoint = None
+        self.n_bootstrap = 2000
+        self.confidence_level = 0.95
+    
+    # Per-process or training-time attributes, left out when a session is written to the shared store
+    TRANSIENT_ATTRIBUTES = ('feature_views', 'trial_cache', 'checkpoint')
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in self.TRANSIENT_ATTRIBUTES:
+            state[name] = None
+        return state
         
     def analyze_dataset(self, df):
         """Comprehensive dataset analysis and feedback"""
+        from column_types import infer_column_types
+        
         info = {
             'shape': df.shape,
             'columns': list(df.columns),
@@ -65,14 +124,10 @@ class HybridMLSystem:
         elif len(df.columns) > 1:
             info['target_column'] = df.columns[-1]
         
-        # Analyze target distribution if target column exists
-        if info['target_column'] and info['target_column'] in df.columns:
-            target_col = df[info['target_column']]
-            if target_col.dtype == 'object' or len(target_col.unique()) < 20:
-                info['class_distribution'] = target_col.value_counts().to_dict()
-                info['is_classification'] = True
-            else:
-                info['is_classification'] = False
+        info.update(self.describe_target(df, info['target_column']))
+        
+        # Datetime and free-text columns among the string columns
+        info['column_types'] = infer_column_types(df)
         
         # Correlation matrix for numeric columns
         if len(info['numeric_columns']) > 1:
@@ -80,10 +135,28 @@ class HybridMLSystem:
         
         return info
     
+    def describe_target(self, df, target_column):
+        """Task type and class distribution for a target column"""
+        target = {'target_column': target_column, 'is_classification': True, 'class_distribution': {}}
+        if target_column and target_column in df.columns:
+            target_col = df[target_column]
+            if target_col.dtype == 'object' or len(target_col.unique()) < 20:
+                target['class_distribution'] = target_col.value_counts().to_dict()
+            else:
+                target['is_classification'] = False
+        return target
+    
     def preprocess_data(self, df, target_column=None):
         """Preprocess dataset for ML training"""
+        from sklearn.preprocessing import LabelEncoder
+        from column_types import infer_column_types, extract_typed_features
+        
         df_processed = df.copy()
         
+        # Datetime and free-text columns become calendar and hashed n-gram features
+        self.column_types = infer_column_types(df_processed, target_column) if self.feature_extraction else {}
+        df_processed = extract_typed_features(df_processed, self.column_types)
+        
         # Handle missing values
         for col in df_processed.columns:
             if df_processed[col].dtype == 'object':
@@ -92,87 +165,424 @@ class HybridMLSystem:
                 df_processed[col].fillna(df_processed[col].median(), inplace=True)
         
         # Encode categorical variables
+        self.categorical_features = []
         for col in df_processed.select_dtypes(include=['object', 'category']).columns:
             if col != target_column:
                 le = LabelEncoder()
                 df_processed[col] = le.fit_transform(df_processed[col].astype(str))
                 self.label_encoders[col] = le
+                self.categorical_features.append(col)
         
         return df_processed
     
-    def train_models(self, X, y, is_classification=True):
+    def build_models(self, n_rows=0, n_features=0):
+        """Unfitted estimators of the model zoo, with scalable substitutes for large datasets"""
+        from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, HistGradientBoostingClassifier
+        from sklearn.calibration import CalibratedClassifierCV
+        from sklearn.kernel_approximation import Nystroem
+        from sklearn.pipeline import make_pipeline
+        from sklearn.neural_network import MLPClassifier
+        from sklearn.svm import SVC, LinearSVC
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.tree import DecisionTreeClassifier
+        from sklearn.neighbors import KNeighborsClassifier
+        import xgboost as xgb
+        from xgboost_fast import FastXGBClassifier
+        from neural import EarlyStoppingMLPClassifier, batch_size_for
+        from neighbors import KNNSweepClassifier
+        from linear import LogisticPathClassifier
+        from features import DEFAULT_MODEL_INPUTS, SPARSE_MODEL_INPUTS, PCA_MODEL_INPUTS
+        
+        thresholds = self.size_thresholds
+        self.model_variants = {}
+        
+        def variant(name, label, reason):
+            self.model_variants[name] = {'variant': label, 'variant_reason': reason}
+        
+        # XGBoost
+        if self.xgboost_fast_path:
+            xgb_model = FastXGBClassifier(categorical_columns=self.categorical_features)
+            variant('XGBoost', 'fast_path', 'hist trees on raw features with early stopping')
+        else:
+            xgb_model = xgb.XGBClassifier(random_state=42, n_jobs=-1)
+            variant('XGBoost', 'default', 'xgboost_fast_path off')
+        
+        # Support Vector Machine: kernel SVC is O(n^2)-O(n^3) in the row count
+        if n_rows > thresholds['svm_linear']:
+            svm = CalibratedClassifierCV(LinearSVC(random_state=42), cv=3)
+            variant('Support Vector Machine', 'linear_svm', f"{n_rows} rows > svm_linear threshold {thresholds['svm_linear']}")
+        elif n_rows > thresholds['svm_kernel_approx']:
+            svm = make_pipeline(Nystroem(n_components=300, random_state=42),
+                                CalibratedClassifierCV(LinearSVC(random_state=42), cv=3))
+            variant('Support Vector Machine', 'nystroem_svm', f"{n_rows} rows > svm_kernel_approx threshold {thresholds['svm_kernel_approx']}")
+        else:
+            svm = SVC(random_state=42, probability=True)
+            variant('Support Vector Machine', 'default', f"{n_rows} rows <= svm_kernel_approx threshold {thresholds['svm_kernel_approx']}")
+        
+        # K-Nearest Neighbors: index the training set instead of brute-force search
+        if self.knn_mode == 'sweep':
+            knn = KNNSweepClassifier(k_max=self.knn_k_max)
+            algorithm = 'kd_tree' if n_features <= knn.max_tree_dims else 'ball_tree'
+            variant('K-Nearest Neighbors', 'k_sweep', f"knn_mode sweep over k=1..{self.knn_k_max} with a {algorithm} for {n_features} features")
+        elif n_rows > thresholds['knn_tree']:
+            algorithm = 'kd_tree' if n_features <= 15 else 'ball_tree'
+            knn = KNeighborsClassifier(n_neighbors=5, algorithm=algorithm)
+            variant('K-Nearest Neighbors', algorithm, f"{n_rows} rows > knn_tree threshold {thresholds['knn_tree']}, {n_features} features")
+        else:
+            knn = KNeighborsClassifier(n_neighbors=5)
+            variant('K-Nearest Neighbors', 'default', f"{n_rows} rows <= knn_tree threshold {thresholds['knn_tree']}")
+        
+        # Neural Network: fixed 1000-iteration budget or epoch-wise early stopping
+        if self.nn_mode == 'early_stopping':
+            nn = EarlyStoppingMLPClassifier(hidden_layer_sizes=(100, 50), use_float32=self.nn_float32, random_state=42)
+            variant('Neural Network', 'early_stopping', f"nn_mode early_stopping, batch size {batch_size_for(n_rows)}")
+        else:
+            nn = MLPClassifier(hidden_layer_sizes=(100, 50), random_state=42, max_iter=1000)
+        
+        # Logistic Regression: single fit at C=1 or a warm-started C path
+        if self.lr_mode == 'path':
+            lr = LogisticPathClassifier(random_state=42, max_iter=1000)
+            variant('Logistic Regression', 'regularization_path', 'lr_mode path over C=1e-3..1e3 with warm starts')
+        else:
+            lr = LogisticRegression(random_state=42, max_iter=1000)
+        
+        # Gradient Boosting: exact splits on one thread do not scale with rows
+        if n_rows > thresholds['gradient_boosting']:
+            gb = HistGradientBoostingClassifier(random_state=42)
+            variant('Gradient Boosting', 'hist_gradient_boosting', f"{n_rows} rows > gradient_boosting threshold {thresholds['gradient_boosting']}")
+        else:
+            gb = GradientBoostingClassifier(random_state=42)
+            variant('Gradient Boosting', 'default', f"{n_rows} rows <= gradient_boosting threshold {thresholds['gradient_boosting']}")
+        
+        models = {
+            'Random Forest': RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1),
+            'XGBoost': xgb_model,
+            'Neural Network': nn,
+            'Support Vector Machine': svm,
+            'Logistic Regression': lr,
+            'Decision Tree': DecisionTreeClassifier(random_state=42),
+            'K-Nearest Neighbors': knn,
+            'Gradient Boosting': gb
+        }
+        if self.model_selection:
+            models = {name: model for name, model in models.items() if name in self.model_selection}
+        for name in models:
+            if name not in self.model_variants:
+                variant(name, 'default', 'no size-dependent substitute')
+        
+        # Representation each model trains on
+        self.model_inputs = {name: DEFAULT_MODEL_INPUTS.get(name, 'scaled') for name in models}
+        if self.model_variants['Support Vector Machine']['variant'] == 'linear_svm':
+            self.model_inputs['Support Vector Machine'] = 'onehot'
+        if self.sparse_mode:
+            self.model_inputs.update({name: SPARSE_MODEL_INPUTS[name] for name in models if name in SPARSE_MODEL_INPUTS})
+        if self.pca_mode != 'off' and n_features > thresholds['pca_features']:
+            self.model_inputs.update({name: PCA_MODEL_INPUTS[name] for name in models
+                                      if name in PCA_MODEL_INPUTS and self.model_inputs[name] == 'scaled'})
+        
+        return models
+    
+    def train_models(self, X, y, is_classification=True, cv_folds=None, tune_top_n=0, tuning_budget=60):
         """Train multiple ML models with hyperparameter tuning"""
+        from sklearn.base import clone
+        from sklearn.model_selection import train_test_split
+        from evaluation import evaluate_predictions, METRIC_NAMES
+        from features import FeatureViews
+        from forest import grow_forest, oob_predictions
+        from tuning import dataset_fingerprint
+        from checkpoints import RunCheckpoint, model_config_key
+        
+        self.checkpoint = None
+        if cv_folds and is_classification:
+            return self.cross_validate_models(X, y, cv_folds)
+        
         models = {}
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y if is_classification else None)
         
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+        # Select features on the training rows; every model trains on the same capped set
+        selected = self.select_features(X_train, y_train)
+        X, X_train, X_test = X[selected], X_train[selected], X_test[selected]
+        
+        # Feature views are built lazily, so only representations some model takes are computed
+        views = FeatureViews(X_train, X_test, self.categorical_features, self.scaler, label_encoders=self.label_encoders,
+                             pca_variance=self.pca_variance, pca_components=self.pca_components)
+        self.feature_views = views
+        
+        estimators = self.build_models(*X_train.shape)
+        adaptive_forest = is_classification and self.forest_mode == 'adaptive' and 'Random Forest' in estimators
+        
+        # The run is identified by its training rows, columns and categorical encoding
+        if self.checkpointing:
+            fingerprint = dataset_fingerprint(X_train, y_train)
+            run_id = hashlib.sha1(json.dumps([fingerprint, list(X_train.columns), self.categorical_features]).encode()).hexdigest()[:20]
+            self.checkpoint = RunCheckpoint(self.checkpoint_dir, run_id)
+        
+        fit_seconds = {}
+        predictions = {}
+        forest_report = None
+        if adaptive_forest:
+            # Grow the forest on all rows; the test rows are scored from trees that never saw them
+            started = time.perf_counter()
+            forest, trace = grow_forest(X, y)
+            fit_seconds['Random Forest'] = time.perf_counter() - started
+            oob_pred, oob_proba = oob_predictions(forest)
+            test_positions = X.index.get_indexer(X_test.index)
+            models['Random Forest'] = forest
+            predictions['Random Forest'] = (oob_pred[test_positions], oob_proba[test_positions])
+            oob_metrics = evaluate_predictions(y, oob_pred, oob_proba, forest.classes_)
+            forest_report = {
+                'n_estimators': forest.n_estimators,
+                'oob_score': float(forest.oob_score_),
+                'training_rows': len(y),
+                'trace': trace,
+                'metrics': {metric: oob_metrics[metric] for metric in METRIC_NAMES}
+            }
         
+        # Fit (or restore) and evaluate each model in turn, checkpointing it and then its test metrics as soon as they exist
+        diagnostics = []
+        matrix_fingerprints = {}
         if is_classification:
-            # Random Forest
-            rf = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
-            rf.fit(X_train_scaled, y_train)
-            models['Random Forest'] = rf
-            
-            # XGBoost
-            xgb_model = xgb.XGBClassifier(random_state=42, n_jobs=-1)
-            xgb_model.fit(X_train_scaled, y_train)
-            models['XGBoost'] = xgb_model
-            
-            # Neural Network
-            nn = MLPClassifier(hidden_layer_sizes=(100, 50), random_state=42, max_iter=1000)
-            nn.fit(X_train_scaled, y_train)
-            models['Neural Network'] = nn
-            
-            # Support Vector Machine
-            svm = SVC(random_state=42, probability=True)
-            svm.fit(X_train_scaled, y_train)
-            models['Support Vector Machine'] = svm
-            
-            # Logistic Regression
-            lr = LogisticRegression(random_state=42, max_iter=1000)
-            lr.fit(X_train_scaled, y_train)
-            models['Logistic Regression'] = lr
-            
-            # Decision Tree
-            dt = DecisionTreeClassifier(random_state=42)
-            dt.fit(X_train_scaled, y_train)
-            models['Decision Tree'] = dt
-            
-            # K-Nearest Neighbors
-            knn = KNeighborsClassifier(n_neighbors=5)
-            knn.fit(X_train_scaled, y_train)
-            models['K-Nearest Neighbors'] = knn
+            for name, model in estimators.items():
+                if adaptive_forest and name == 'Random Forest':
+                    continue
+                representation = self.model_inputs[name]
+                X_fit = views.train(representation)
+                if self.checkpoint:
+                    # A checkpoint is reused only for the exact matrix it was fitted on (PCA settings, selected columns, ...)
+                    if representation not in matrix_fingerprints:
+                        matrix_fingerprints[representation] = dataset_fingerprint(X_fit, y_train)
+                    config_key = model_config_key(model, representation, matrix_fingerprints[representation])
+                restored = self.checkpoint.load(name, config_key, n_features=X_fit.shape[1]) if self.checkpoint else None
+                if restored:
+                    model, fit_seconds[name] = restored
+                else:
+                    started = time.perf_counter()
+                    model.fit(X_fit, y_train)
+                    fit_seconds[name] = time.perf_counter() - started
+                    if self.checkpoint:
+                        self.checkpoint.save(name, config_key, model, fit_seconds[name])
+                models[name] = model
+                
+                predictions[name] = self.predict_model(name, model, views.test(representation), y_test, diagnostics)
+                if self.checkpoint:
+                    y_pred, y_pred_proba = predictions[name]
+                    metrics = evaluate_predictions(y_test, y_pred, y_pred_proba, getattr(model, 'classes_', None))
+                    self.checkpoint.save_metrics(name, config_key, {metric: metrics[metric] for metric in METRIC_NAMES})
+        
+        # Models trained on principal components, optionally against a full-dimensional baseline
+        for name, model in models.items():
+            if self.model_inputs[name] != 'pca':
+                continue
+            report = {'n_components': views.pca_kept, 'input_dims': X_train.shape[1], 'fit_seconds': fit_seconds[name]}
+            if self.pca_mode == 'compare':
+                baseline = clone(model)
+                started = time.perf_counter()
+                baseline.fit(views.train('scaled'), y_train)
+                report['baseline_fit_seconds'] = time.perf_counter() - started
+                report['fit_time_saving'] = 1 - report['fit_seconds'] / max(report['baseline_fit_seconds'], 1e-9)
+                # Prediction is timed as well: it is where KNN spends its time
+                for prefix, estimator, representation in (('', model, 'pca'), ('baseline_', baseline, 'scaled')):
+                    started = time.perf_counter()
+                    y_pred = estimator.predict(views.test(representation))
+                    report[f'{prefix}predict_seconds'] = time.perf_counter() - started
+                    report[f'{prefix}accuracy'] = float(np.mean(y_pred == np.asarray(y_test)))
+                report['accuracy_change'] = report['accuracy'] - report['baseline_accuracy']
+            diagnostics.append((name, model, 'pca', report))
+        
+        results = self.score_predictions(models, y_test, predictions)
+        
+        # Optional tuning stage for the best ranked models
+        if tune_top_n:
+            tuning = self.tune_models(results, views, y_train, tune_top_n, tuning_budget, estimators)
+            for name, summary in tuning.items():
+                # The tuned configuration replaces the default only if it scored better on the same validation
+                # rows of the training split; the test rows only score the model that was chosen
+                summary['applied'] = (bool(summary['best_params']) and summary['default_score'] is not None
+                                      and summary['best_score'] > summary['default_score'])
+                if not summary['applied']:
+                    continue
+                model = clone(estimators[name]).set_params(**summary['best_params'])
+                started = time.perf_counter()
+                model.fit(views.train(self.model_inputs[name]), y_train)
+                fit_seconds[name] = time.perf_counter() - started
+                X_eval = views.test(self.model_inputs[name])
+                models[name] = model
+                predictions[name] = (model.predict(X_eval), model.predict_proba(X_eval) if hasattr(model, 'predict_proba') else None)
+            results = self.score_predictions(models, y_test, predictions)
+            for name, summary in tuning.items():
+                results[name]['tuning'] = summary
+        
+        # Per-model diagnostics, unless tuning replaced the model they describe
+        for name, model, key, report in diagnostics:
+            if models[name] is model:
+                results[name][key] = report
+        for name, seconds in fit_seconds.items():
+            results[name]['fit_seconds'] = seconds
+        
+        if forest_report and models['Random Forest'] is forest:
+            results['Random Forest']['oob'] = forest_report
+        
+        return results, X_test, y_test
+    
+    def predict_model(self, name, model, X_eval, y_test, diagnostics):
+        """Test-set predictions and probabilities of a fitted model, appending its sweep or path diagnostics"""
+        if hasattr(model, 'k_sweep'):
+            # One k_max query scores every k and yields the predictions at the chosen k
+            sweep = model.k_sweep(X_eval, y_test)
+            diagnostics.append((name, model, 'k_sweep', {
+                'best_k': model.best_k_,
+                'algorithm': model.algorithm_,
+                'validation_scores': model.k_scores_.tolist(),
+                'test_scores': sweep['scores'].tolist()
+            }))
+            return sweep['predictions'], sweep['probabilities']
+        if hasattr(model, 'path_report'):
+            diagnostics.append((name, model, 'regularization_path', {
+                'best_C': model.best_C_,
+                'path': model.path_report(X_eval, y_test)
+            }))
+        return model.predict(X_eval), model.predict_proba(X_eval) if hasattr(model, 'predict_proba') else None
+    
+    def select_features(self, X, y=None):
+        """Columns kept by the feature selection stage, recording its report; without a target only label-free filters run"""
+        from selection import select_features
+        
+        if not self.feature_selection:
+            self.selection_report = None
+            return list(X.columns)
+        selected, self.selection_report = select_features(X, y, self.dataset_info.get('correlation_matrix'),
+                                                          method=self.feature_selection, max_features=self.max_features)
+        return selected
+    
+    def tune_models(self, results, views, y_train, top_n=3, budget_seconds=60, estimators=None):
+        """Successive-halving search for the top-N models, sharing one wall-clock budget with their refits"""
+        from tuning import TrialCache, successive_halving, search_space
+        
+        if self.trial_cache is None:
+            self.trial_cache = TrialCache(self.trial_cache_dir)
+        estimators = estimators or self.build_models(*views.train('raw').shape)
+        top_names = sorted(results, key=lambda name: results[name]['rank'])[:top_n]
+        deadline = time.time() + budget_seconds
+        
+        tuning = {}
+        reserved = 0.0
+        for i, name in enumerate(top_names):
+            # Split what is left of the budget, less the estimated refits of the winners so far, over the models still to tune
+            share = max(0.0, deadline - time.time() - reserved) / (len(top_names) - i)
+            space = search_space(name, self.model_variants[name]['variant'])
+            X_train = views.train(self.model_inputs[name])
+            tuning[name] = successive_halving(name, estimators[name], X_train, y_train, self.trial_cache, budget_seconds=share, space=space)
+            reserved += tuning[name]['refit_estimate']
+        
+        return tuning
+    
+    def cross_validate_models(self, X, y, n_folds=5):
+        """Stratified k-fold evaluation of the model zoo on the shared process pool"""
+        import scipy.sparse as sp
+        from sklearn.base import clone
+        from sklearn.model_selection import StratifiedKFold
+        from features import FeatureViews
+        from parallel import get_pool, fit_and_predict
+        
+        y_values = np.asarray(y)
+        classes, class_counts = np.unique(y_values, return_counts=True)
+        
+        # Selection runs on every row before folding, so it must not see the target: scoring
+        # features against held-out labels would inflate the fold scores
+        X = X[self.select_features(X)]
+        
+        # Fold indices are computed once and shared by every estimator
+        n_splits = max(2, min(n_folds, class_counts.min()))
+        folds = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42).split(X, y_values))
+        
+        # Unscaled views are shared by the folds; scaling is refit inside each fold.
+        # The sparse design, its projection and PCA are unsupervised and built once on all rows.
+        views = FeatureViews(X, None, self.categorical_features, self.scaler, label_encoders=self.label_encoders,
+                             pca_variance=self.pca_variance, pca_components=self.pca_components)
+        self.feature_views = views
+        unscaled = {'raw': 'raw', 'scaled': 'raw', 'onehot': 'expanded', 'sparse': 'sparse', 'projected': 'projected', 'pca': 'pca'}
+        
+        # Fan out model x fold tasks, plus one full-data fit per model for the ensemble
+        pool = get_pool()
+        fold_tasks = {}
+        full_tasks = {}
+        for name, estimator in self.build_models(*X.shape).items():
+            representation = self.model_inputs[name]
+            X_folds = views.train(unscaled[representation])
+            X_folds = X_folds if sp.issparse(X_folds) else np.asarray(X_folds, dtype=float)
+            scale = unscaled[representation] != representation
+            fold_tasks[name] = [
+                pool.submit(fit_and_predict, clone(estimator), X_folds, y_values, train_idx, test_idx, scale=scale)
+                for train_idx, test_idx in folds
+            ]
+            full_tasks[name] = pool.submit(fit_and_predict, estimator, views.train(representation), y_values, scale=False)
+        
+        # Collect out-of-fold predictions, aligning probability columns to the global classes
+        models = {}
+        predictions = {}
+        fold_scores = {}
+        self.oof_predictions = {}
+        for name, tasks in fold_tasks.items():
+            oof_pred = np.empty_like(y_values)
+            oof_proba = np.zeros((len(y_values), len(classes)))
+            scores = []
+            for (_, test_idx), task in zip(folds, tasks):
+                fold = task.result()
+                oof_pred[test_idx] = fold['predictions']
+                if fold['probabilities'] is not None:
+                    columns = np.searchsorted(classes, fold['classes'])
+                    oof_proba[np.ix_(test_idx, columns)] = fold['probabilities']
+                scores.append(float(np.mean(fold['predictions'] == y_values[test_idx])))
             
-            # Gradient Boosting
-            gb = GradientBoostingClassifier(random_state=42)
-            gb.fit(X_train_scaled, y_train)
-            models['Gradient Boosting'] = gb
+            models[name] = full_tasks[name].result()['model']
+            predictions[name] = (oof_pred, oof_proba)
+            fold_scores[name] = scores
+            self.oof_predictions[name] = {'predictions': oof_pred, 'probabilities': oof_proba}
+        
+        results = self.score_predictions(models, y_values, predictions)
+        for name, scores in fold_scores.items():
+            results[name]['cv_scores'] = scores
+            results[name]['cv_mean'] = float(np.mean(scores))
+            results[name]['cv_std'] = float(np.std(scores))
+        
+        return results, X, y_values
+    
+    def score_predictions(self, models, y_true, predictions):
+        """Score cached predictions of each model and rank them with tie awareness"""
+        from evaluation import evaluate_predictions, bootstrap_metrics, summarize_bootstrap, rank_models
         
-        # Evaluate models
         results = {}
-        for name, model in models.items():
-            y_pred = model.predict(X_test_scaled)
-            y_pred_proba = model.predict_proba(X_test_scaled) if hasattr(model, 'predict_proba') else None
+        bootstrap_samples = {}
+        for name, (y_pred, y_pred_proba) in predictions.items():
+            classes = getattr(models[name], 'classes_', None)
             
-            results[name] = {
-                'accuracy': accuracy_score(y_test, y_pred),
-                'precision': precision_score(y_test, y_pred, average='weighted', zero_division=0),
-                'recall': recall_score(y_test, y_pred, average='weighted', zero_division=0),
-                'f1_score': f1_score(y_test, y_pred, average='weighted', zero_division=0),
-                'roc_auc': roc_auc_score(y_test, y_pred_proba, multi_class='ovr', average='weighted') if y_pred_proba is not None else 0,
-                'model': model
-            }
+            results[name] = evaluate_predictions(y_true, y_pred, y_pred_proba, classes)
+            results[name]['model'] = models[name]
+            results[name].update(self.model_variants.get(name, {}))
+            results[name]['input_representation'] = self.model_inputs.get(name, 'scaled')
+            if hasattr(models[name], 'epoch_trace_'):
+                results[name]['epoch_trace'] = models[name].epoch_trace_
+            
+            # Bootstrap the cached predictions (same resamples for every model)
+            bootstrap_samples[name] = bootstrap_metrics(y_true, y_pred, y_pred_proba, classes, n_resamples=self.n_bootstrap)
+            results[name]['confidence_intervals'] = summarize_bootstrap(bootstrap_samples[name], self.confidence_level)
+        
+        # Rank models, treating statistically indistinguishable scores as ties
+        ranking, tiers = rank_models(results, bootstrap_samples, self.confidence_level)
+        for rank, name in enumerate(ranking, start=1):
+            results[name]['rank'] = rank
+            results[name]['tier'] = tiers[name]
         
-        return results, X_test_scaled, y_test
+        return results
     
     def create_hybrid_ensemble(self, models, X_test, y_test):
         """Create hybrid ensemble of top 3 models"""
-        # Get top 3 models by accuracy
-        sorted_models = sorted(models.items(), key=lambda x: x[1]['accuracy'], reverse=True)
+        from sklearn.ensemble import VotingClassifier
+        
+        # Get top 3 models by tie-aware rank
+        sorted_models = sorted(models.items(), key=lambda x: x[1]['rank'])
         top_3_models = sorted_models[:3]
         
         # Create voting classifier
@@ -182,7 +592,7 @@ class HybridMLSystem:
         # Train ensemble (we need to retrain with original data)
         return ensemble, [name for name, _ in top_3_models]
     
-    def generate_feedback(self, dataset_info, model_results):
+    def generate_feedback(self, dataset_info, model_results, feature_selection=None):
         """Generate comprehensive feedback about dataset and model performance"""
         feedback = {
             'dataset_quality': {},
@@ -206,7 +616,7 @@ class HybridMLSystem:
         }
         
         # Model performance analysis
-        best_model = max(model_results.items(), key=lambda x: x[1]['accuracy'])
+        best_model = min(model_results.items(), key=lambda x: x[1]['rank'])
         feedback['model_performance'] = {
             'best_model': best_model[0],
             'best_accuracy': best_model[1]['accuracy'],
@@ -232,6 +642,23 @@ class HybridMLSystem:
         elif best_model[1]['accuracy'] > 0.9:
             feedback['insights'].append("Excellent model performance achieved!")
         
+        column_types = dataset_info.get('column_types', {}) if self.feature_extraction else {}
+        extracted = {kind: [col for col, info in column_types.items() if info['type'] == kind and col != dataset_info['target_column']]
+                     for kind in ('datetime', 'text')}
+        if extracted['datetime']:
+            feedback['insights'].append(f"Calendar features were extracted from datetime columns: {', '.join(extracted['datetime'])}")
+        if extracted['text']:
+            feedback['insights'].append(f"Hashed word features were extracted from free-text columns: {', '.join(extracted['text'])}")
+        
+        if feature_selection and feature_selection['dropped']:
+            feedback['dataset_quality']['dropped_features'] = feature_selection['dropped']
+            feedback['insights'].append(f"Feature selection kept {feature_selection['n_selected']} of {feature_selection['n_input']} features; "
+                                        f"dropped: {', '.join(feature_selection['dropped'])}")
+        
+        tied_models = [name for name, result in model_results.items() if result['tier'] == 1 and name != best_model[0]]
+        if tied_models:
+            feedback['insights'].append(f"{len(tied_models)} other model(s) are statistically tied with {best_model[0]} on this test set: {', '.join(tied_models)}")
+        
         feedback['recommendations'] = [
             "Consider feature scaling for better model performance",
             "Try ensemble methods for improved accuracy",
@@ -240,90 +667,128 @@ class HybridMLSystem:
         ]
         
         return feedback
+
+FOREST_MODES = ('fixed', 'adaptive')
+NN_MODES = ('fixed', 'early_stopping')
+KNN_MODES = ('fixed', 'sweep')
+LR_MODES = ('fixed', 'path')
+PCA_MODES = ('off', 'reduce', 'compare')
+
+
+class InvalidSetting(ValueError):
+    """An upload setting outside the values it accepts, answered with a 400"""
+
+
+def form_choice(name, choices, default):
+    """Value of a form field that must be one of `choices`"""
+    value = request.form.get(name, default)
+    if value not in choices:
+        raise InvalidSetting(f"Unknown {name}: {value} (expected one of {', '.join(choices)})")
+    return value
+
+# Upload pipeline: each stage is cached by the hashes of its inputs and configuration,
+# so changing only the target column or the model list reruns only downstream stages.
+# Outputs hold whole frames and fitted models, so the cache is bounded by measured size too.
+upload_pipeline = Pipeline(
+    max_entries=int(os.environ.get('ML_PIPELINE_CACHE_ENTRIES', 32)),
+    max_bytes=int(os.environ.get('ML_PIPELINE_CACHE_MB', 1024)) * 2**20,
+    sizeof=deep_nbytes
+)
+
+# Per-session ML state: each upload trains on its own HybridMLSystem, kept here for the GET endpoints.
+# Sessions are also written to a directory, so every prefork worker (and a restarted server) finds
+# them. A session is measured by its live attributes, not by the state it is pickled to, which
+# leaves out what only lives in memory.
+sessions = SessionStore(
+    max_sessions=int(os.environ.get('ML_SESSION_MAX', 64)),
+    max_bytes=int(os.environ.get('ML_SESSION_MAX_MB', 4096)) * 2**20,
+    ttl_seconds=float(os.environ.get('ML_SESSION_TTL', 3600)),
+    sizeof=lambda system: deep_nbytes(vars(system)),
+    directory=os.environ.get('ML_SESSION_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'sessions'))
+)
+
+# Admission control for training: a few jobs at a time within a memory budget, a bounded wait queue,
+# 429 beyond it. Uploads whose training is already cached skip it.
+memory_budget_mb = os.environ.get('ML_TRAINING_MEMORY_MB')
+admission = AdmissionController(
+    max_concurrent=int(os.environ.get('ML_MAX_CONCURRENT_TRAINING', max(1, (os.cpu_count() or 1) // 2))),
+    max_queue=int(os.environ.get('ML_MAX_QUEUED_TRAINING', 8)),
+    memory_budget=int(memory_budget_mb) * 2**20 if memory_budget_mb else (physical_memory() or 0) // 2 or None
+)
+
+def training_cost(run, training):
+    """Estimated cost of the upload's train stage, from the preprocessed frame's shape"""
+    n_rows, n_columns = run.get('preprocess')['frame'].shape
+    n_models = len(training['models']) if training['models'] else 8
+    return estimate_training_cost(n_rows, n_columns - 1, n_models, training['cv_folds'], training['tuning_budget'] if training['tune_top_n'] else 0)
+
+def session_id_of_request():
+    session_id = request.values.get('session_id') or request.headers.get('X-Session-ID')
+    return session_id if SessionStore.valid_id(session_id) else None
+
+def current_session():
+    """HybridMLSystem of the requesting session, or None if the id is missing, unknown or expired"""
+    session_id = session_id_of_request()
+    return sessions.get(session_id) if session_id else None
+
+def session_not_found():
+    return jsonify({'error': 'Unknown or expired session; pass the session_id returned by /api/upload-dataset'}), 404
+
+@upload_pipeline.stage('read', params=('filename', 'content'))
+def read_stage(system, filename, content):
+    if filename.endswith('.csv'):
+        return pd.read_csv(io.BytesIO(content))
+    return pd.read_excel(io.BytesIO(content))
+
+@upload_pipeline.stage('analyze', deps=('read',))
+def analyze_stage(system, df):
+    return system.analyze_dataset(df)
+
+@upload_pipeline.stage('target', deps=('read', 'analyze'), params=('target_column',))
+def target_stage(system, df, info, target_column):
+    return {**info, **system.describe_target(df, target_column or info['target_column'])}
+
+@upload_pipeline.stage('preprocess', deps=('read', 'target'))
+def preprocess_stage(system, df, dataset_info):
+    system.label_encoders = {}
+    frame = system.preprocess_data(df, dataset_info['target_column'])
+    return {'frame': frame, 'label_encoders': system.label_encoders, 'categorical_features': system.categorical_features,
+            'column_types': system.column_types}
+
+@upload_pipeline.stage('train', deps=('preprocess', 'target'), params=('training',))
+def train_stage(system, prepared, dataset_info, training):
+    system.dataset_info = dataset_info
+    system.label_encoders = prepared['label_encoders']
+    system.categorical_features = prepared['categorical_features']
+    system.model_selection = training['models']
+    for setting in ('forest_mode', 'nn_mode', 'nn_float32', 'knn_mode', 'lr_mode', 'sparse_mode', 'feature_selection', 'max_features',
+                    'pca_mode', 'pca_variance', 'pca_components'):
+        setattr(system, setting, training[setting])
     
-    def create_performance_plots(self, model_results, top_3_names):
-        """Create performance comparison plots for top 3 models"""
-        # Prepare data
-        models = list(model_results.keys())
-        metrics = ['accuracy', 'precision', 'recall', 'f1_score', 'roc_auc']
-        
-        # Create subplots
-        fig = make_subplots(
-            rows=2, cols=3,
-            subplot_titles=['Accuracy Comparison', 'Precision vs Recall', 'F1-Score Distribution', 
-                          'ROC-AUC Scores', 'Overall Performance', 'Model Ranking'],
-            specs=[[{"type": "bar"}, {"type": "scatter"}, {"type": "bar"}],
-                   [{"type": "bar"}, {"type": "radar"}, {"type": "bar"}]]
-        )
-        
-        # Accuracy comparison
-        accuracies = [model_results[model]['accuracy'] for model in models]
-        fig.add_trace(
-            go.Bar(x=models, y=accuracies, name='Accuracy', marker_color='lightblue'),
-            row=1, col=1
-        )
-        
-        # Precision vs Recall scatter
-        precisions = [model_results[model]['precision'] for model in models]
-        recalls = [model_results[model]['recall'] for model in models]
-        fig.add_trace(
-            go.Scatter(x=precisions, y=recalls, mode='markers+text', 
-                      text=models, textposition='top center',
-                      marker=dict(size=10, color='red'), name='Precision vs Recall'),
-            row=1, col=2
-        )
-        
-        # F1-Score distribution
-        f1_scores = [model_results[model]['f1_score'] for model in models]
-        fig.add_trace(
-            go.Bar(x=models, y=f1_scores, name='F1-Score', marker_color='lightgreen'),
-            row=1, col=3
-        )
-        
-        # ROC-AUC scores
-        roc_aucs = [model_results[model]['roc_auc'] for model in models]
-        fig.add_trace(
-            go.Bar(x=models, y=roc_aucs, name='ROC-AUC', marker_color='orange'),
-            row=2, col=1
-        )
-        
-        # Radar chart for top 3 models
-        for i, model_name in enumerate(top_3_names[:3]):
-            if model_name in model_results:
-                values = [model_results[model_name][metric] for metric in metrics]
-                fig.add_trace(
-                    go.Scatterpolar(
-                        r=values,
-                        theta=metrics,
-                        fill='toself',
-                        name=model_name,
-                        line=dict(color=px.colors.qualitative.Set1[i])
-                    ),
-                    row=2, col=2
-                )
-        
-        # Model ranking
-        sorted_models = sorted(model_results.items(), key=lambda x: x[1]['accuracy'], reverse=True)
-        ranked_models = [item[0] for item in sorted_models]
-        ranked_accuracies = [item[1]['accuracy'] for item in sorted_models]
-        
-        fig.add_trace(
-            go.Bar(x=ranked_models, y=ranked_accuracies, name='Ranking', 
-                  marker_color=['gold' if i < 3 else 'lightgray' for i in range(len(ranked_models))]),
-            row=2, col=3
-        )
-        
-        # Update layout
-        fig.update_layout(
-            height=800,
-            title_text="Machine Learning Model Performance Analysis",
-            showlegend=True
-        )
-        
-        return fig
-
-# Initialize ML system
-ml_system = HybridMLSystem()
+    target_column = dataset_info['target_column']
+    X = prepared['frame'].drop(columns=[target_column])
+    y = prepared['frame'][target_column]
+    results, X_test, y_test = system.train_models(X, y, dataset_info['is_classification'], cv_folds=training['cv_folds'],
+                                                  tune_top_n=training['tune_top_n'], tuning_budget=training['tuning_budget'])
+    return {'results': results, 'X_test': X_test, 'y_test': y_test, 'feature_views': system.feature_views.report(),
+            'feature_selection': system.selection_report, 'checkpoint': system.checkpoint.report() if system.checkpoint else None}
+
+@upload_pipeline.stage('ensemble', deps=('train',))
+def ensemble_stage(system, trained):
+    return system.create_hybrid_ensemble(trained['results'], trained['X_test'], trained['y_test'])
+
+@upload_pipeline.stage('feedback', deps=('target', 'train'))
+def feedback_stage(system, dataset_info, trained):
+    return system.generate_feedback(dataset_info, trained['results'], trained['feature_selection'])
+
+@upload_pipeline.stage('charts', deps=('train', 'ensemble'))
+def charts_stage(system, trained, ensemble):
+    return chart_data(trained['results'], ensemble[1])
+
+# Only resolved when a client asks for the server-built figure
+@upload_pipeline.stage('plots', deps=('charts',))
+def plots_stage(system, charts):
+    return performance_figure(charts).to_json()
 
 @app.route('/api/upload-dataset', methods=['POST'])
 def upload_dataset():
@@ -335,56 +800,102 @@ def upload_dataset():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
         
-        # Read dataset
-        if file.filename.endswith('.csv'):
-            df = pd.read_csv(file)
-        elif file.filename.endswith(('.xlsx', '.xls')):
-            df = pd.read_excel(file)
-        else:
+        if not file.filename.endswith(('.csv', '.xlsx', '.xls')):
             return jsonify({'error': 'Unsupported file format'}), 400
         
-        # Analyze dataset
-        dataset_info = ml_system.analyze_dataset(df)
-        ml_system.dataset_info = dataset_info
+        # Settings are validated before any work: an unknown mode or a bad number is a 400, never a silent default
+        try:
+            pca_variance = float(request.form.get('pca_variance', 0.95))
+            pca_components = int(request.form.get('pca_components', 50))
+        except ValueError:
+            return jsonify({'error': 'pca_variance must be a number and pca_components an integer'}), 400
+        if not 0 < pca_variance <= 1 or pca_components < 1:
+            return jsonify({'error': 'pca_variance must be in (0, 1] and pca_components at least 1'}), 400
+        
+        from selection import METHODS as SELECTION_METHODS
+        feature_selection = form_choice('feature_selection', ('none',) + SELECTION_METHODS, 'univariate')
+        
+        # Training configuration (optionally k-fold cross-validation and a model subset)
+        models = request.form.get('models')
+        params = {
+            'filename': file.filename,
+            'content': file.read(),
+            'target_column': request.form.get('target_column'),
+            'training': {
+                'models': sorted(name.strip() for name in models.split(',')) if models else None,
+                'cv_folds': request.form.get('cv_folds', type=int),
+                'forest_mode': form_choice('forest_mode', FOREST_MODES, 'fixed'),
+                'nn_mode': form_choice('nn_mode', NN_MODES, 'fixed'),
+                'nn_float32': request.form.get('nn_float32', 'false').lower() == 'true',
+                'knn_mode': form_choice('knn_mode', KNN_MODES, 'fixed'),
+                'lr_mode': form_choice('lr_mode', LR_MODES, 'fixed'),
+                'sparse_mode': request.form.get('sparse_mode', 'false').lower() == 'true',
+                'feature_selection': None if feature_selection == 'none' else feature_selection,
+                'max_features': request.form.get('max_features', 50, type=int),
+                'pca_mode': form_choice('pca_mode', PCA_MODES, 'off'),
+                'pca_variance': pca_variance,
+                'pca_components': pca_components,
+                'tune_top_n': request.form.get('tune_top_n', 0, type=int),
+                'tuning_budget': request.form.get('tuning_budget', 60, type=float)
+            }
+        }
+        # A fresh system per upload, so concurrent uploads never share mutable state
+        session_id = session_id_of_request() or SessionStore.new_id()
+        ml_system = HybridMLSystem()
+        run = upload_pipeline.start(params, ml_system)
         
-        # Preprocess data
-        target_column = dataset_info['target_column']
-        if target_column is None:
+        # Analyze dataset and resolve the target column
+        dataset_info = run.get('target')
+        ml_system.dataset_info = dataset_info
+        ml_system.etags['dataset_info'] = run.keys['target']
+        if dataset_info['target_column'] is None:
             return jsonify({'error': 'Could not identify target column'}), 400
-        
-        df_processed = ml_system.preprocess_data(df, target_column)
-        
-        # Prepare features and target
-        X = df_processed.drop(columns=[target_column])
-        y = df_processed[target_column]
-        
-        # Train models
-        model_results, X_test, y_test = ml_system.train_models(X, y, dataset_info['is_classification'])
-        ml_system.results = model_results
-        
-        # Create hybrid ensemble
-        ensemble, top_3_names = ml_system.create_hybrid_ensemble(model_results, X_test, y_test)
-        
-        # Generate feedback
-        feedback = ml_system.generate_feedback(dataset_info, model_results)
-        
-        # Create performance plots
-        plot_fig = ml_system.create_performance_plots(model_results, top_3_names)
-        plot_json = plot_fig.to_json()
+        if dataset_info['target_column'] not in dataset_info['columns']:
+            return jsonify({'error': f"Unknown target column: {dataset_info['target_column']}"}), 400
+        
+        # Train models, build the ensemble, feedback and chart data. Only the upload that computes the train
+        # stage takes a training slot; cached results and identical uploads already training or queued do not.
+        try:
+            trained = run.get('train', guard=lambda: admission.admit(training_cost(run, params['training'])))
+        except QueueFull as e:
+            response = jsonify({'error': str(e), 'retry_after': e.retry_after, 'queue': admission.stats()})
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response, 429
+        ml_system.results = trained['results']
+        ml_system.etags['results'] = run.keys['train']
+        ensemble, top_3_names = run.get('ensemble')
+        feedback = run.get('feedback')
+        charts = run.get('charts')
+        ml_system.charts = charts
+        ml_system.etags['charts'] = run.keys['charts']
+        # The session keeps results, not the pipeline run or the training-time feature matrices
+        ml_system.feature_views = None
+        sessions.put(session_id, ml_system)
         
         # Prepare response
         response = {
             'success': True,
+            'session_id': session_id,
             'dataset_info': dataset_info,
-            'model_results': model_results,
+            'model_results': trained['results'],
             'feedback': feedback,
             'top_3_models': top_3_names,
-            'plot_data': plot_json,
-            'ensemble_created': True
+            'chart_data': charts,
+            'ensemble_created': True,
+            'feature_views': trained['feature_views'],
+            'column_types': run.get('preprocess')['column_types'],
+            'feature_selection': trained['feature_selection'],
+            'checkpoint': trained['checkpoint'],
+            'pipeline': run.report
         }
+        # Server-built Plotly JSON only for clients that still ask for it
+        if request.form.get('include_plot', 'false').lower() == 'true':
+            response['plot_data'] = run.get('plots')
         
         return jsonify(response)
         
+    except InvalidSetting as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -410,11 +921,64 @@ def train_ensemble():
 
 @app.route('/api/get-dataset-info', methods=['GET'])
 def get_dataset_info():
-    return jsonify(ml_system.dataset_info)
+    ml_system = current_session()
+    if ml_system is None:
+        return session_not_found()
+    return conditional_json(ml_system.etags.get('dataset_info'), ml_system.dataset_info)
 
 @app.route('/api/get-model-results', methods=['GET'])
 def get_model_results():
-    return jsonify(ml_system.results)
+    ml_system = current_session()
+    if ml_system is None:
+        return session_not_found()
+    return conditional_json(ml_system.etags.get('results'), ml_system.results)
+
+@app.route('/api/chart-data', methods=['GET'])
+def get_chart_data():
+    ml_system = current_session()
+    if ml_system is None:
+        return session_not_found()
+    return conditional_json(ml_system.etags['charts'], ml_system.charts)
+
+@app.route('/api/plot-figure', methods=['GET'])
+def get_plot_figure():
+    # Built from the session's chart data, and only when the client does not already have it
+    ml_system = current_session()
+    if ml_system is None:
+        return session_not_found()
+    return conditional_json(ml_system.etags['charts'], lambda: {'plot_data': performance_figure(ml_system.charts).to_json()})
+
+@app.route('/api/queue', methods=['GET'])
+def get_queue():
+    return jsonify(admission.stats())
+
+@app.route('/api/sessions', methods=['GET'])
+def get_sessions():
+    return jsonify(sessions.stats())
+
+@app.route('/api/health', methods=['GET'])
+def health_check():
+    return jsonify({'status': 'healthy', 'message': 'ML Backend is running'})
+
+def preload_training_stack():
+    """Import everything the training stages use, e.g. in a prefork master before workers fork"""
+    for name in PRELOAD_MODULES:
+        importlib.import_module(name)
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    parser = argparse.ArgumentParser(description='ML backend server')
+    parser.add_argument('--production', action='store_true', help='prefork server instead of the development server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--max-requests', type=int, default=1000, help='recycle a worker after this many requests (0: never)')
+    parser.add_argument('--graceful-timeout', type=float, default=30)
+    parser.add_argument('--report-interval', type=float, default=300, help='seconds between worker memory reports')
+    args = parser.parse_args()
+    
+    if args.production:
+        from prefork import serve
+        serve(app, args.host, args.port, args.workers, preload=[preload_training_stack], max_requests=args.max_requests,
+              graceful_timeout=args.graceful_timeout, report_interval=args.report_interval)
+    else:
+        app.run(debug=True, host=args.host, port=args.port)
@@ -14,28 +14,14 @@ from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_sc
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 import xgboost as xgb
 import plotly.graph_objects as go
+from serialization import NumpyJSONProvider
 import warnings
 warnings.filterwarnings('ignore')
 
 app = Flask(__name__)
+app.json = NumpyJSONProvider(app)
 CORS(app)
 
-def convert_to_serializable(obj):
-    """Convert numpy types to Python native types for JSON serialization"""
-    if isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, dict):
-        return {key: convert_to_serializable(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_to_serializable(item) for item in obj]
-    elif hasattr(obj, 'dtype'):  # Handle pandas dtypes
-        return str(obj)
-    return obj
-
 class FinalMLSystem:
     def __init__(self):
         self.scaler = StandardScaler()
@@ -232,9 +218,9 @@ def upload_dataset():
         # Prepare response with proper serialization
         response = {
             'success': True,
-            'dataset_info': convert_to_serializable(dataset_info),
-            'model_results': convert_to_serializable(model_results),
-            'feedback': convert_to_serializable(feedback),
+            'dataset_info': dataset_info,
+            'model_results': model_results,
+            'feedback': feedback,
             'top_3_models': top_3_names,
             'plot_data': plot_data,
             'ensemble_created': True
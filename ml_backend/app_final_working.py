@@ -13,19 +13,14 @@ from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_sc
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 import xgboost as xgb
 import plotly.graph_objects as go
+from serialization import NumpyJSONProvider
 import warnings
 warnings.filterwarnings('ignore')
 
 app = Flask(__name__)
+app.json = NumpyJSONProvider(app)
 CORS(app)
 
-def safe_float(value):
-    """Convert value to float safely"""
-    try:
-        return float(value)
-    except:
-        return 0.0
-
 class FinalWorkingMLSystem:
     def __init__(self):
         self.scaler = StandardScaler()
@@ -87,15 +82,15 @@ class FinalWorkingMLSystem:
                 y_pred = model.predict(X_test_scaled)
                 y_pred_proba = model.predict_proba(X_test_scaled) if hasattr(model, 'predict_proba') else None
                 
-                # Calculate metrics with safe conversion
-                accuracy = safe_float(accuracy_score(y_test, y_pred))
-                precision = safe_float(precision_score(y_test, y_pred, average='weighted', zero_division=0))
-                recall = safe_float(recall_score(y_test, y_pred, average='weighted', zero_division=0))
-                f1 = safe_float(f1_score(y_test, y_pred, average='weighted', zero_division=0))
+                # Calculate metrics
+                accuracy = float(accuracy_score(y_test, y_pred))
+                precision = float(precision_score(y_test, y_pred, average='weighted', zero_division=0))
+                recall = float(recall_score(y_test, y_pred, average='weighted', zero_division=0))
+                f1 = float(f1_score(y_test, y_pred, average='weighted', zero_division=0))
                 
                 if y_pred_proba is not None:
                     try:
-                        roc_auc = safe_float(roc_auc_score(y_test, y_pred_proba, multi_class='ovr', average='weighted'))
+                        roc_auc = float(roc_auc_score(y_test, y_pred_proba, multi_class='ovr', average='weighted'))
                     except:
                         roc_auc = 0.0
                 else:
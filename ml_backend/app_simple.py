@@ -1,30 +1,23 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify
 from flask_cors import CORS
 import pandas as pd
 import numpy as np
-import json
-import os
-import io
-import base64
-from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
+from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, VotingClassifier
 from sklearn.neural_network import MLPClassifier
 from sklearn.svm import SVC
 from sklearn.linear_model import LogisticRegression
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.neighbors import KNeighborsClassifier
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score, classification_report
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 import xgboost as xgb
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
+from serialization import NumpyJSONProvider
 import warnings
 warnings.filterwarnings('ignore')
 
 app = Flask(__name__)
+app.json = NumpyJSONProvider(app)
 CORS(app)
 
 class HybridMLSystem:
@@ -244,6 +237,9 @@ class HybridMLSystem:
     
     def create_performance_plots(self, model_results, top_3_names):
         """Create performance comparison plots for top 3 models"""
+        # Plotly is only needed here; importing it at startup slows the server's cold start
+        import plotly.graph_objects as go
+        
         # Prepare data
         models = list(model_results.keys())
         metrics = ['accuracy', 'precision', 'recall', 'f1_score', 'roc_auc']
@@ -350,25 +346,6 @@ def upload_dataset():
         plot_fig = ml_system.create_performance_plots(model_results, top_3_names)
         plot_json = plot_fig.to_json()
         
-        # Convert numpy types to Python types for JSON serialization
-        def convert_numpy_types(obj):
-            if isinstance(obj, np.integer):
-                return int(obj)
-            elif isinstance(obj, np.floating):
-                return float(obj)
-            elif isinstance(obj, np.ndarray):
-                return obj.tolist()
-            elif isinstance(obj, dict):
-                return {key: convert_numpy_types(value) for key, value in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_numpy_types(item) for item in obj]
-            return obj
-        
-        # Convert all numpy types
-        dataset_info = convert_numpy_types(dataset_info)
-        model_results = convert_numpy_types(model_results)
-        feedback = convert_numpy_types(feedback)
-        
         # Prepare response
         response = {
             'success': True,
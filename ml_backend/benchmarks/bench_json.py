@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: response encoding with the shared encoder vs the old conversion walkers
+Run from the ml_backend directory: python benchmarks/bench_json.py
+"""
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import serialization
+from app import HybridMLSystem
+
+
+def convert_to_serializable(obj):
+    """The walker app_final.py used before jsonify"""
+    if isinstance(obj, np.integer):
+        return int(obj)
+    elif isinstance(obj, np.floating):
+        return float(obj)
+    elif isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif isinstance(obj, dict):
+        return {key: convert_to_serializable(value) for key, value in obj.items()}
+    elif isinstance(obj, list):
+        return [convert_to_serializable(item) for item in obj]
+    elif hasattr(obj, 'dtype'):
+        return str(obj)
+    return obj
+
+
+def convert_numpy_types(obj):
+    """The walker app_simple.py used before jsonify"""
+    if isinstance(obj, np.integer):
+        return int(obj)
+    elif isinstance(obj, np.floating):
+        return float(obj)
+    elif isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif isinstance(obj, dict):
+        return {key: convert_numpy_types(value) for key, value in obj.items()}
+    elif isinstance(obj, list):
+        return [convert_numpy_types(item) for item in obj]
+    return obj
+
+
+def make_payload(n_rows, n_columns, n_classes=3):
+    """dataset_info of a synthetic upload plus model results shaped like train_models output"""
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame(rng.normal(size=(n_rows, n_columns)), columns=[f'num_{i}' for i in range(n_columns)])
+    df['target'] = rng.integers(0, n_classes, n_rows)
+    dataset_info = HybridMLSystem().analyze_dataset(df)
+    # app_simple's walker cannot encode dtype objects; give every encoder the same input
+    dataset_info['dtypes'] = {col: str(dtype) for col, dtype in dataset_info['dtypes'].items()}
+
+    model_results = {}
+    for i in range(8):
+        model_results[f'model_{i}'] = {
+            'accuracy': np.float64(rng.random()),
+            'confusion_matrix': rng.integers(0, 100, (n_classes, n_classes)),
+            'per_class': {str(c): {'precision': np.float32(rng.random()), 'support': np.int64(rng.integers(100))} for c in range(n_classes)},
+            'epoch_trace': [{'epoch': np.int64(e), 'loss': np.float64(rng.random())} for e in range(200)]
+        }
+    return {'success': True, 'dataset_info': dataset_info, 'model_results': model_results}
+
+
+def best_of(encode, payload, repeats=5):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        encode(payload)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    encoders = [
+        ('convert_to_serializable + json', lambda payload: json.dumps(convert_to_serializable(payload))),
+        ('convert_numpy_types + json', lambda payload: json.dumps(convert_numpy_types(payload))),
+        ('shared encoder (json)', lambda payload: serialization.dumps(payload, fast=False)),
+    ]
+    if serialization.orjson is not None:
+        encoders.append(('shared encoder (orjson)', lambda payload: serialization.dumps(payload)))
+    else:
+        print('orjson is not installed; skipping the fast backend')
+
+    print(f"{'payload':<22}{'encoder':<34}{'time':>10}{'bytes':>12}")
+    for n_rows, n_columns in ((1_000, 20), (5_000, 100), (5_000, 300)):
+        payload = make_payload(n_rows, n_columns)
+        label = f'{n_rows} x {n_columns}'
+        for name, encode in encoders:
+            seconds = best_of(encode, payload)
+            print(f"{label:<22}{name:<34}{seconds * 1000:>8.1f}ms{len(encode(payload)):>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: backend cold start, from `python -X importtime` in fresh interpreters
+Run from the ml_backend directory: python benchmarks/bench_startup.py [--ref GIT_REF]
+
+With --ref, the backend at that git revision (e.g. the commit before the
+imports were deferred) is measured next to the working tree.
+"""
+
+import argparse
+import io
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(BACKEND_DIR)
+
+# What the training stages import on first use, on top of the app module
+TRAINING_STACK = 'import sklearn.ensemble, sklearn.svm, sklearn.neural_network, xgboost, features, tuning, selection'
+
+
+def import_times(statement, backend_dir=BACKEND_DIR, repeats=3):
+    """Cumulative import times in seconds by module, best of `repeats` fresh interpreters"""
+    best = {}
+    for _ in range(repeats):
+        stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=backend_dir,
+                                capture_output=True, text=True, check=True).stderr
+        times = {}
+        for line in stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            _, cumulative, name = line.split('|')
+            # Top-level imports of the statement are indented by one space only
+            if not name.startswith('  '):
+                times[name.strip()] = int(cumulative) / 1e6
+        for name, seconds in times.items():
+            best[name] = min(best.get(name, seconds), seconds)
+    return best
+
+
+def extract_backend(ref, directory):
+    """Write the ml_backend directory as of a git ref into `directory` and return its path"""
+    archive = subprocess.run(['git', 'archive', ref, '--', os.path.basename(BACKEND_DIR)], cwd=REPO_DIR,
+                             capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(directory)
+    return os.path.join(directory, os.path.basename(BACKEND_DIR))
+
+
+def measure(backend_dir):
+    """Import time of the app module and of what the first upload still has to import"""
+    app_times = import_times('import app', backend_dir)
+    stack = import_times(f'import app; {TRAINING_STACK}', backend_dir)
+    deferred = {name: seconds for name, seconds in stack.items() if name != 'app' and name not in app_times}
+    return app_times, deferred
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--ref', help='git revision to measure next to the working tree')
+    args = parser.parse_args()
+
+    trees = [('working tree', BACKEND_DIR)]
+    with tempfile.TemporaryDirectory() as directory:
+        if args.ref:
+            trees.insert(0, (args.ref, extract_backend(args.ref, directory)))
+        results = {label: measure(backend_dir) for label, backend_dir in trees}
+
+    print(f"{'':<40}" + ''.join(f'{label[:14]:>16}' for label, _ in trees))
+    rows = [
+        ('import app', lambda app_times, deferred: app_times['app']),
+        ('deferred to the first upload', lambda app_times, deferred: sum(deferred.values())),
+        ('import app + first upload', lambda app_times, deferred: app_times['app'] + sum(deferred.values()))
+    ]
+    for title, value in rows:
+        print(f'{title:<40}' + ''.join(f'{value(*results[label]):>15.2f}s' for label, _ in trees))
+
+    health = import_times("import app; app.app.test_client().get('/api/health')")
+    print(f"{'imports through GET /api/health':<40}{sum(health.values()):>{16 * len(trees) - 1}.2f}s")
+
+    _, deferred = results['working tree']
+    print('\nslowest imports of the deferred training stack:')
+    for name, seconds in sorted(deferred.items(), key=lambda item: -item[1])[:8]:
+        print(f'  {name:<38}{seconds:>8.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: XGBoost fast path vs the original XGBoost path in train_models
+Run from the ml_backend directory: python benchmarks/bench_xgboost.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.datasets import make_classification
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler, LabelEncoder
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from xgboost_fast import FastXGBClassifier
+
+
+def make_dataset(n_rows, n_numeric=20, n_categorical=5, n_levels=30, n_classes=3):
+    """Synthetic upload with numeric and string categorical columns"""
+    X, y = make_classification(n_samples=n_rows, n_features=n_numeric, n_informative=10,
+                               n_classes=n_classes, random_state=42)
+    df = pd.DataFrame(X, columns=[f'num_{i}' for i in range(n_numeric)])
+    rng = np.random.default_rng(42)
+    for i in range(n_categorical):
+        levels = rng.integers(0, n_levels, n_rows)
+        # Make the categories informative by tying them to the class
+        levels = np.where(rng.random(n_rows) < 0.3, y * 7 % n_levels, levels)
+        df[f'cat_{i}'] = np.char.add('level_', levels.astype(str))
+    df['target'] = y
+    return df
+
+
+def encode(df):
+    """Same label encoding preprocess_data applies"""
+    categorical = [col for col in df.columns if df[col].dtype == object]
+    for col in categorical:
+        df[col] = LabelEncoder().fit_transform(df[col].astype(str))
+    return df, categorical
+
+
+def run(df):
+    df, categorical = encode(df.copy())
+    X = df.drop(columns=['target'])
+    y = df['target']
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+    # Original path: scale everything, default XGBClassifier
+    start = time.perf_counter()
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+    model = xgb.XGBClassifier(random_state=42, n_jobs=-1)
+    model.fit(X_train_scaled, y_train)
+    original_time = time.perf_counter() - start
+    original_accuracy = float(np.mean(model.predict(X_test_scaled) == y_test))
+
+    # Fast path: raw features, native categoricals, hist + early stopping
+    start = time.perf_counter()
+    fast = FastXGBClassifier(categorical_columns=categorical)
+    fast.fit(X_train, y_train)
+    fast_time = time.perf_counter() - start
+    fast_accuracy = float(np.mean(fast.predict(X_test) == y_test))
+
+    return original_time, original_accuracy, fast_time, fast_accuracy, fast.best_iteration_ + 1
+
+
+def main():
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'sample_datasets')
+    iris = pd.read_csv(os.path.join(root, 'iris_sample.csv')).rename(columns={'species': 'target'})
+    iris['target'] = iris['target'].astype('category').cat.codes
+
+    datasets = [('iris_sample.csv', iris)]
+    datasets += [(f'synthetic {n} rows', make_dataset(n)) for n in (300, 500, 1_000, 2_000, 5_000, 20_000, 50_000)]
+
+    print(f"{'dataset':<24}{'original fit':>14}{'acc':>8}{'fast fit':>12}{'acc':>8}{'rounds':>8}")
+    for name, df in datasets:
+        original_time, original_accuracy, fast_time, fast_accuracy, rounds = run(df)
+        print(f"{name:<24}{original_time:>13.3f}s{original_accuracy:>8.3f}{fast_time:>11.3f}s{fast_accuracy:>8.3f}{rounds:>8}")
+
+
+if __name__ == '__main__':
+    main()
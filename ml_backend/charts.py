@@ -0,0 +1,69 @@
+METRICS = ['accuracy', 'precision', 'recall', 'f1_score', 'roc_auc']
+# Plotly's qualitative Set1, used for the top 3 models
+TOP_COLORS = ['#e41a1c', '#377eb8', '#4daf4a']
+RANKED_COLOR = 'gold'
+OTHER_COLOR = 'lightgray'
+
+
+def chart_data(model_results, top_3_names, digits=4):
+    """Compact chart spec of the model results: one array per metric, aligned with `models`.
+
+    Models are listed by rank. `top_3` names the highlighted models and
+    `colors` gives each model its marker colour, so the frontend can draw
+    every chart without further lookups.
+    """
+    ranked = sorted(model_results, key=lambda name: model_results[name]['rank'])
+    top_3 = [name for name in top_3_names[:3] if name in model_results]
+    colors = [TOP_COLORS[top_3.index(name)] if name in top_3 else OTHER_COLOR for name in ranked]
+    return {
+        'models': ranked,
+        'rank': [int(model_results[name]['rank']) for name in ranked],
+        'metrics': {metric: [round(float(model_results[name][metric]), digits) for name in ranked] for metric in METRICS},
+        'top_3': top_3,
+        'colors': colors
+    }
+
+
+def performance_figure(spec):
+    """Full Plotly figure of a chart spec, for clients that want server-built JSON"""
+    # Imported here so Plotly is only loaded when a figure is actually requested
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    models = spec['models']
+    metrics = spec['metrics']
+    fig = make_subplots(
+        rows=2, cols=3,
+        subplot_titles=['Accuracy Comparison', 'Precision vs Recall', 'F1-Score Distribution',
+                        'ROC-AUC Scores', 'Overall Performance', 'Model Ranking'],
+        specs=[[{"type": "bar"}, {"type": "scatter"}, {"type": "bar"}],
+               [{"type": "bar"}, {"type": "polar"}, {"type": "bar"}]]
+    )
+
+    fig.add_trace(go.Bar(x=models, y=metrics['accuracy'], name='Accuracy', marker_color='lightblue'), row=1, col=1)
+    fig.add_trace(
+        go.Scatter(x=metrics['precision'], y=metrics['recall'], mode='markers+text', text=models, textposition='top center',
+                   marker=dict(size=10, color='red'), name='Precision vs Recall'),
+        row=1, col=2
+    )
+    fig.add_trace(go.Bar(x=models, y=metrics['f1_score'], name='F1-Score', marker_color='lightgreen'), row=1, col=3)
+    fig.add_trace(go.Bar(x=models, y=metrics['roc_auc'], name='ROC-AUC', marker_color='orange'), row=2, col=1)
+
+    # Polar chart of every metric for the top 3 models
+    for i, model_name in enumerate(spec['top_3']):
+        index = models.index(model_name)
+        fig.add_trace(
+            go.Scatterpolar(r=[metrics[metric][index] for metric in METRICS], theta=METRICS, fill='toself',
+                            name=model_name, line=dict(color=TOP_COLORS[i])),
+            row=2, col=2
+        )
+
+    # Models are already in rank order
+    fig.add_trace(
+        go.Bar(x=models, y=metrics['accuracy'], name='Ranking',
+               marker_color=[RANKED_COLOR if i < 3 else OTHER_COLOR for i in range(len(models))]),
+        row=2, col=3
+    )
+
+    fig.update_layout(height=800, title_text="Machine Learning Model Performance Analysis", showlegend=True)
+    return fig
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+import joblib
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Serializes manifest updates between the threads of one process; flock covers other processes
+_manifest_lock = threading.Lock()
+
+# Manifests in an older layout are ignored: their models are trained again
+MANIFEST_VERSION = 2
+
+
+def model_config_key(model, representation, matrix_fingerprint=''):
+    """Digest of an unfitted estimator's parameters, the representation it trains on and that matrix's fingerprint"""
+    params = json.dumps(model.get_params(), sort_keys=True, default=repr)
+    return hashlib.sha1(f'{type(model).__name__}|{representation}|{matrix_fingerprint}|{params}'.encode()).hexdigest()[:16]
+
+
+class RunCheckpoint:
+    """Run directory holding each fitted model of one training run, written as soon as it is fitted.
+
+    A run is identified by a fingerprint of its training data; a model is
+    reused only if its parameters, input representation and exact training
+    matrix are unchanged, and it takes as many features as that matrix has.
+    Each model is a joblib artifact next to a manifest.json of its fit time
+    and test metrics, keyed by model name and configuration, so requests
+    alternating between settings keep a checkpoint of each; the
+    `max_configs` most recently saved configurations of a model are kept.
+    Files are written to a temporary name and renamed, so a process killed
+    mid-write leaves no partial checkpoint behind, and manifest updates are
+    merged into the file under a lock, so runs sharing the directory keep
+    each other's entries.
+    """
+
+    def __init__(self, base_dir, run_id, max_runs=20, max_configs=4):
+        self.base_dir = base_dir
+        self.run_dir = os.path.join(base_dir, run_id)
+        self.max_runs = max_runs
+        self.max_configs = max_configs
+        self.resumed = []
+        self.saved = []
+        new_run = not os.path.isdir(self.run_dir)
+        os.makedirs(self.run_dir, exist_ok=True)
+        self.manifest = self._read_manifest()
+        if new_run:
+            self._prune()
+
+    def _read_manifest(self):
+        try:
+            with open(os.path.join(self.run_dir, 'manifest.json')) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = None
+        if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+            manifest = {'version': MANIFEST_VERSION, 'models': {}}
+        return manifest
+
+    @contextmanager
+    def _locked(self):
+        with _manifest_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.run_dir, 'manifest.lock'), 'w') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                yield
+
+    def _update_manifest(self, name, update):
+        """Apply `update` to a model's entries by configuration in the manifest on disk and write it back.
+
+        `update` gets a copy of the entries (empty if there are none) and
+        returns them changed, or None to leave the manifest as it is.
+        """
+        with self._locked():
+            self.manifest = self._read_manifest()
+            entries = update(dict(self.manifest['models'].get(name, {})))
+            if entries is None:
+                return
+            self.manifest['models'][name] = entries
+            self.manifest['updated'] = time.time()
+
+            def write(path):
+                with open(path, 'w') as f:
+                    json.dump(self.manifest, f, default=str)
+            self._atomic(os.path.join(self.run_dir, 'manifest.json'), write)
+
+    @staticmethod
+    def _atomic(path, write):
+        partial = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        write(partial)
+        os.replace(partial, path)
+
+    def _prune(self):
+        """Drop the least recently updated runs beyond `max_runs`"""
+        runs = [os.path.join(self.base_dir, name) for name in os.listdir(self.base_dir)]
+        runs = sorted((path for path in runs if os.path.isdir(path)), key=os.path.getmtime, reverse=True)
+        for path in runs[self.max_runs:]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def load(self, name, config_key, n_features=None):
+        """Fitted model and fit seconds saved under this configuration, or None"""
+        entry = self.manifest['models'].get(name, {}).get(config_key)
+        if entry is None:
+            return None
+        try:
+            model = joblib.load(os.path.join(self.run_dir, entry['artifact']))
+        except Exception:
+            # Missing, truncated or written by incompatible library versions: train it again
+            return None
+        if n_features is not None and getattr(model, 'n_features_in_', n_features) != n_features:
+            return None
+        self.resumed.append(name)
+        return model, entry['fit_seconds']
+
+    def save(self, name, config_key, model, fit_seconds):
+        artifact = f"{hashlib.sha1(name.encode()).hexdigest()[:8]}-{config_key}.joblib"
+        self._atomic(os.path.join(self.run_dir, artifact), lambda path: joblib.dump(model, path))
+
+        def add(entries):
+            entries[config_key] = {'artifact': artifact, 'fit_seconds': fit_seconds, 'saved': time.time()}
+            for key in sorted(entries, key=lambda key: entries[key]['saved'], reverse=True)[self.max_configs:]:
+                self._remove_artifact(entries.pop(key)['artifact'])
+            return entries
+        self._update_manifest(name, add)
+        self.saved.append(name)
+
+    def save_metrics(self, name, config_key, metrics):
+        """Record a model's test metrics, unless its checkpoint under this configuration has since been dropped"""
+        def add(entries):
+            if config_key not in entries:
+                return None
+            entries[config_key] = {**entries[config_key], 'metrics': metrics}
+            return entries
+        self._update_manifest(name, add)
+
+    def _remove_artifact(self, artifact):
+        try:
+            os.remove(os.path.join(self.run_dir, artifact))
+        except OSError:
+            pass
+
+    def report(self):
+        return {'run_dir': self.run_dir, 'resumed': list(self.resumed), 'trained': list(self.saved)}
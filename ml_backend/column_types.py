@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+from features import is_text, hashed_ngrams
+
+# Formats tried when typing a string column as datetime, most specific first.
+# Time-only formats cover attendance-style values such as '09:15 AM'.
+DATETIME_FORMATS = [
+    'ISO8601',
+    '%m/%d/%Y %H:%M:%S', '%m/%d/%Y %H:%M', '%m/%d/%Y',
+    '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%d/%m/%Y',
+    '%d-%m-%Y', '%b %d, %Y', '%d %b %Y',
+    '%I:%M %p', '%I:%M:%S %p', '%H:%M', '%H:%M:%S'
+]
+TIME_ONLY_FORMATS = {'%I:%M %p', '%I:%M:%S %p', '%H:%M', '%H:%M:%S'}
+# ISO 8601 also parses bare years and digit strings ('2019', '20190101'); require a year-month with a separator
+ISO8601_PREFIX = r'\d{4}-\d{1,2}'
+
+
+def detect_datetime_format(values, min_parsed=0.9):
+    """First format that parses at least `min_parsed` of the values, or None"""
+    values = pd.Series(values, dtype=object).astype(str)
+    for fmt in DATETIME_FORMATS:
+        parsed = pd.to_datetime(values, format=fmt, errors='coerce')
+        if fmt == 'ISO8601':
+            parsed = parsed.where(values.str.match(ISO8601_PREFIX))
+        if parsed.notna().mean() >= min_parsed:
+            return fmt
+    return None
+
+
+def infer_column_types(df, target_column=None, sample_size=200):
+    """Type each string column as 'datetime', 'text' or 'categorical' from a sample of its distinct values"""
+    types = {}
+    for col in df.select_dtypes(include=['object', 'category']).columns:
+        if col == target_column:
+            continue
+        distinct = pd.unique(df[col].dropna().astype(str))[:sample_size]
+        fmt = detect_datetime_format(distinct) if len(distinct) else None
+        if fmt is not None:
+            types[col] = {'type': 'datetime', 'format': fmt}
+        elif is_text(distinct):
+            types[col] = {'type': 'text'}
+        else:
+            types[col] = {'type': 'categorical'}
+    return types
+
+
+def datetime_features(values, fmt):
+    """Calendar features of a datetime column, computed with datetime64 arithmetic.
+
+    Date formats give year, month, day, day of week and day of year; formats
+    with a time of day add hour and minute of day. Unparseable values are
+    NaN in every feature.
+    """
+    parsed = pd.to_datetime(pd.Series(values, dtype=object).astype(str), format=fmt, errors='coerce')
+    stamps = parsed.to_numpy(dtype='datetime64[m]')
+    valid = ~np.isnat(stamps)
+    days = stamps.astype('datetime64[D]')
+    months = stamps.astype('datetime64[M]')
+
+    minute_of_day = (stamps - days).astype(np.int64)
+    features = {}
+    if fmt not in TIME_ONLY_FORMATS:
+        day_numbers = days.astype(np.int64)
+        features['year'] = stamps.astype('datetime64[Y]').astype(np.int64) + 1970
+        features['month'] = months.astype(np.int64) % 12 + 1
+        features['day'] = (days - months.astype('datetime64[D]')).astype(np.int64) + 1
+        features['dayofweek'] = (day_numbers + 3) % 7  # 1970-01-01 was a Thursday; Monday is 0
+        features['dayofyear'] = (days - stamps.astype('datetime64[Y]').astype('datetime64[D]')).astype(np.int64) + 1
+    if fmt in TIME_ONLY_FORMATS or minute_of_day[valid].any():
+        features['hour'] = minute_of_day // 60
+        features['minute_of_day'] = minute_of_day
+
+    return {name: np.where(valid, values_, np.nan) for name, values_ in features.items()}
+
+
+def text_features(values, n_features=32):
+    """Compact text features: word count, length and hashed 1-2 gram frequencies.
+
+    The hashing runs once per distinct string and rows are gathered by code,
+    so repeated values cost nothing extra.
+    """
+    strings = pd.Series(values, dtype=object).fillna('').astype(str).to_numpy(dtype=str)
+    distinct, codes = np.unique(strings, return_inverse=True)
+    hashed = hashed_ngrams(distinct, n_features).toarray()
+    totals = hashed.sum(axis=1, keepdims=True)
+    hashed = np.divide(hashed, totals, out=np.zeros_like(hashed), where=totals > 0)
+
+    n_chars = np.char.str_len(distinct)
+    features = {
+        'n_words': (np.char.count(distinct, ' ') + (n_chars > 0))[codes],
+        'n_chars': n_chars[codes]
+    }
+    for bucket in range(n_features):
+        features[f'h{bucket}'] = hashed[codes, bucket]
+    return features
+
+
+def extract_typed_features(df, column_types):
+    """Replace datetime and text columns by their non-constant numeric features"""
+    extracted = {}
+    for col, info in column_types.items():
+        if info['type'] == 'datetime':
+            features = datetime_features(df[col], info['format'])
+        elif info['type'] == 'text':
+            features = text_features(df[col])
+        else:
+            continue
+        for name, values in features.items():
+            values = np.asarray(values, dtype=float)
+            # Features constant over the column (e.g. month of a year-only date) carry nothing
+            if np.isfinite(values).any() and np.nanmin(values) != np.nanmax(values):
+                extracted[f'{col}_{name}'] = values
+
+    replaced = [col for col, info in column_types.items() if info['type'] != 'categorical']
+    if not replaced:
+        return df
+    return pd.concat([df.drop(columns=replaced), pd.DataFrame(extracted, index=df.index)], axis=1)
@@ -0,0 +1,246 @@
+import numpy as np
+
+
+def _safe_divide(numerator, denominator):
+    """Element-wise division that yields 0 where the denominator is 0"""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    out = np.zeros_like(numerator)
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+    return out
+
+
+def confusion_matrix_counts(true_idx, pred_idx, n_labels):
+    """Build a confusion matrix from integer label codes with one bincount"""
+    flat = np.bincount(true_idx * n_labels + pred_idx, minlength=n_labels * n_labels)
+    return flat.reshape(n_labels, n_labels)
+
+
+def binary_auc(scores, positives):
+    """Rank-based (Mann-Whitney) ROC-AUC from a single sort, with tie-averaged ranks"""
+    n_pos = int(positives.sum())
+    n_neg = len(scores) - n_pos
+    if n_pos == 0 or n_neg == 0:
+        return None
+
+    order = np.argsort(scores, kind='mergesort')
+    sorted_scores = scores[order]
+
+    # Average the 1-based ranks inside each group of tied scores
+    boundaries = np.flatnonzero(np.diff(sorted_scores)) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(scores)]))
+    ranks = np.repeat((starts + ends + 1) / 2.0, ends - starts)
+
+    rank_sum = ranks[positives[order]].sum()
+    return float((rank_sum - n_pos * (n_pos + 1) / 2.0) / (n_pos * n_neg))
+
+
+def ovr_auc(y_true, y_proba, classes):
+    """One-vs-rest ROC-AUC per class, plus the support-weighted average"""
+    y_proba = np.asarray(y_proba, dtype=float)
+    classes = np.asarray(classes)
+
+    # Binary problems are scored on the positive-class column only
+    if len(classes) == 2:
+        auc = binary_auc(y_proba[:, 1], y_true == classes[1])
+        return (auc if auc is not None else 0.0), {}
+
+    per_class = {}
+    weighted_sum = 0.0
+    weight_total = 0
+    for col, cls in enumerate(classes):
+        positives = y_true == cls
+        auc = binary_auc(y_proba[:, col], positives)
+        if auc is None:
+            continue
+        per_class[cls] = auc
+        support = int(positives.sum())
+        weighted_sum += auc * support
+        weight_total += support
+
+    return (weighted_sum / weight_total if weight_total else 0.0), per_class
+
+
+def evaluate_predictions(y_true, y_pred, y_proba=None, classes=None):
+    """Compute all holdout metrics from one confusion matrix in a single pass"""
+    y_true = np.asarray(y_true)
+    y_pred = np.asarray(y_pred)
+
+    # Encode labels once; every metric below works on these integer codes
+    labels, codes = np.unique(np.concatenate([y_true, y_pred]), return_inverse=True)
+    true_idx, pred_idx = codes[:len(y_true)], codes[len(y_true):]
+    cm = confusion_matrix_counts(true_idx, pred_idx, len(labels))
+
+    tp = np.diag(cm)
+    support = cm.sum(axis=1)
+    predicted = cm.sum(axis=0)
+    precision = _safe_divide(tp, predicted)
+    recall = _safe_divide(tp, support)
+    f1 = _safe_divide(2 * precision * recall, precision + recall)
+    weights = _safe_divide(support, support.sum())
+
+    roc_auc, class_auc = 0.0, {}
+    if y_proba is not None:
+        proba_classes = classes if classes is not None else labels
+        roc_auc, class_auc = ovr_auc(y_true, y_proba, proba_classes)
+
+    per_class = {}
+    for i, label in enumerate(labels):
+        per_class[str(label)] = {
+            'precision': float(precision[i]),
+            'recall': float(recall[i]),
+            'f1_score': float(f1[i]),
+            'roc_auc': class_auc.get(label),
+            'support': int(support[i])
+        }
+
+    return {
+        'accuracy': float(tp.sum() / len(y_true)) if len(y_true) else 0.0,
+        'precision': float(precision @ weights),
+        'recall': float(recall @ weights),
+        'f1_score': float(f1 @ weights),
+        'roc_auc': float(roc_auc),
+        'per_class': per_class,
+        'confusion_matrix': cm.tolist(),
+        'labels': [str(label) for label in labels]
+    }
+
+
+METRIC_NAMES = ['accuracy', 'precision', 'recall', 'f1_score', 'roc_auc']
+
+
+def _resample_counts(n_samples, n_resamples, random_state=42, max_cells=4_000_000):
+    """Yield bootstrap count matrices (resamples x rows) in memory-bounded chunks.
+
+    Chunks are seeded deterministically, so every model evaluated with the same
+    arguments sees exactly the same resamples (a paired bootstrap).
+    """
+    chunk_size = max(1, min(n_resamples, max_cells // max(n_samples, 1)))
+    for chunk_index, start in enumerate(range(0, n_resamples, chunk_size)):
+        size = min(chunk_size, n_resamples - start)
+        rng = np.random.default_rng([random_state, chunk_index])
+        draws = rng.integers(0, n_samples, size=(size, n_samples))
+        offsets = (np.arange(size) * n_samples)[:, None]
+        counts = np.bincount((draws + offsets).ravel(), minlength=size * n_samples)
+        yield counts.reshape(size, n_samples).astype(float)
+
+
+def _bootstrap_auc(counts, scores, positives):
+    """Weighted Mann-Whitney AUC for every resample from one sort of the scores"""
+    order = np.argsort(scores, kind='mergesort')
+    sorted_scores = scores[order]
+    starts = np.flatnonzero(np.concatenate(([True], np.diff(sorted_scores) != 0)))
+
+    weights = counts[:, order]
+    is_pos = positives[order]
+    pos = np.add.reduceat(weights * is_pos, starts, axis=1)
+    neg = np.add.reduceat(weights * ~is_pos, starts, axis=1)
+    neg_below = np.cumsum(neg, axis=1) - neg
+
+    n_pos = pos.sum(axis=1)
+    denom = n_pos * neg.sum(axis=1)
+    auc = _safe_divide((pos * (neg_below + 0.5 * neg)).sum(axis=1), denom)
+    return auc, n_pos, denom > 0
+
+
+def _bootstrap_chunk(counts, true_idx, pred_idx, n_labels, y_true, y_proba, proba_classes):
+    """Per-resample metric arrays for one chunk of bootstrap counts"""
+    # Confusion matrix of every resample in one matmul against the one-hot cell index
+    cells = np.zeros((len(true_idx), n_labels * n_labels))
+    cells[np.arange(len(true_idx)), true_idx * n_labels + pred_idx] = 1.0
+    cm = (counts @ cells).reshape(-1, n_labels, n_labels)
+
+    tp = np.diagonal(cm, axis1=1, axis2=2)
+    support = cm.sum(axis=2)
+    predicted = cm.sum(axis=1)
+    total = support.sum(axis=1, keepdims=True)
+    precision = _safe_divide(tp, predicted)
+    recall = _safe_divide(tp, support)
+    f1 = _safe_divide(2 * precision * recall, precision + recall)
+    weights = _safe_divide(support, total)
+
+    samples = {
+        'accuracy': tp.sum(axis=1) / total[:, 0],
+        'precision': (precision * weights).sum(axis=1),
+        'recall': (recall * weights).sum(axis=1),
+        'f1_score': (f1 * weights).sum(axis=1),
+        'roc_auc': np.zeros(len(counts))
+    }
+
+    if y_proba is not None:
+        if len(proba_classes) == 2:
+            auc, _, valid = _bootstrap_auc(counts, y_proba[:, 1], y_true == proba_classes[1])
+            samples['roc_auc'] = np.where(valid, auc, 0.0)
+        else:
+            weighted = np.zeros(len(counts))
+            weight_total = np.zeros(len(counts))
+            for col, cls in enumerate(proba_classes):
+                auc, n_pos, valid = _bootstrap_auc(counts, y_proba[:, col], y_true == cls)
+                weighted += np.where(valid, auc * n_pos, 0.0)
+                weight_total += np.where(valid, n_pos, 0.0)
+            samples['roc_auc'] = _safe_divide(weighted, weight_total)
+
+    return samples
+
+
+def bootstrap_metrics(y_true, y_pred, y_proba=None, classes=None, n_resamples=2000, random_state=42):
+    """Bootstrap distribution of every holdout metric from cached test predictions.
+
+    No model is refit: each resample only reweights the test rows, and all
+    resamples of a chunk are scored together with array operations.
+    """
+    y_true = np.asarray(y_true)
+    y_pred = np.asarray(y_pred)
+    labels, codes = np.unique(np.concatenate([y_true, y_pred]), return_inverse=True)
+    true_idx, pred_idx = codes[:len(y_true)], codes[len(y_true):]
+    proba = np.asarray(y_proba, dtype=float) if y_proba is not None else None
+    proba_classes = np.asarray(classes) if classes is not None else labels
+
+    chunks = [
+        _bootstrap_chunk(counts, true_idx, pred_idx, len(labels), y_true, proba, proba_classes)
+        for counts in _resample_counts(len(y_true), n_resamples, random_state)
+    ]
+    return {metric: np.concatenate([chunk[metric] for chunk in chunks]) for metric in METRIC_NAMES}
+
+
+def summarize_bootstrap(samples, confidence=0.95):
+    """Percentile confidence interval and standard error for each metric"""
+    alpha = (1 - confidence) / 2
+    return {
+        metric: {
+            'low': float(np.quantile(values, alpha)),
+            'high': float(np.quantile(values, 1 - alpha)),
+            'std': float(values.std())
+        }
+        for metric, values in samples.items()
+    }
+
+
+def rank_models(results, samples, confidence=0.95, metric='accuracy'):
+    """Rank models into tiers of statistically tied scores.
+
+    Models are taken in order of their point score; each tier leader absorbs
+    every remaining model whose paired bootstrap difference from it has a
+    confidence interval reaching zero. Inside a tier, F1 and then ROC-AUC
+    break the tie. Returns the ordered names and a tier number per model.
+    """
+    alpha = (1 - confidence) / 2
+    remaining = sorted(results, key=lambda name: results[name][metric], reverse=True)
+    ordered, tiers = [], {}
+
+    tier_number = 0
+    while remaining:
+        tier_number += 1
+        leader = remaining[0]
+        tier = [
+            name for name in remaining
+            if name == leader or np.quantile(samples[leader][metric] - samples[name][metric], alpha) <= 0
+        ]
+        tier.sort(key=lambda name: (results[name]['f1_score'], results[name]['roc_auc'], results[name][metric]), reverse=True)
+        for name in tier:
+            tiers[name] = tier_number
+        ordered.extend(tier)
+        remaining = [name for name in remaining if name not in tier]
+
+    return ordered, tiers
@@ -0,0 +1,265 @@
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.decomposition import PCA, IncrementalPCA, TruncatedSVD
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import StandardScaler
+
+# Representation each model consumes. Trees split on raw values and need no
+# scaling; linear models get low-cardinality categoricals one-hot encoded.
+DEFAULT_MODEL_INPUTS = {
+    'Random Forest': 'raw',
+    'XGBoost': 'raw',
+    'Neural Network': 'scaled',
+    'Support Vector Machine': 'scaled',
+    'Logistic Regression': 'onehot',
+    'Decision Tree': 'raw',
+    'K-Nearest Neighbors': 'scaled',
+    'Gradient Boosting': 'raw'
+}
+
+# Sparse mode: sparse-capable models take the CSR design matrix, dense-only
+# models a low-rank projection of it; trees keep the label-encoded columns
+SPARSE_MODEL_INPUTS = {
+    'XGBoost': 'sparse',
+    'Support Vector Machine': 'sparse',
+    'Logistic Regression': 'sparse',
+    'Neural Network': 'projected',
+    'K-Nearest Neighbors': 'projected'
+}
+
+# PCA mode: distance and matrix-heavy models move from the scaled view to its principal components
+PCA_MODEL_INPUTS = {
+    'Neural Network': 'pca',
+    'Support Vector Machine': 'pca',
+    'K-Nearest Neighbors': 'pca'
+}
+
+
+def onehot_levels(X, categorical_columns, max_levels=20):
+    """Levels of the categorical columns small enough to expand into indicators"""
+    levels = {}
+    for col in categorical_columns:
+        if col in X.columns:
+            values = np.sort(X[col].dropna().unique())
+            if len(values) <= max_levels:
+                levels[col] = values
+    return levels
+
+
+def expand_onehot(X, levels):
+    """Replace categorical code columns by indicator columns over fixed levels"""
+    if not levels:
+        return X
+    frame = X.copy()
+    for col, values in levels.items():
+        frame[col] = pd.Categorical(frame[col], categories=values)
+    return pd.get_dummies(frame, columns=list(levels), dtype=float)
+
+
+def is_text(values, min_words=3):
+    """Whether distinct string values read as free text rather than category labels"""
+    values = np.asarray(values, dtype=str)
+    return len(values) > 0 and (np.char.count(values, ' ') + 1).mean() >= min_words
+
+
+def hashed_ngrams(values, n_features=2 ** 12):
+    """Hashed word unigram and bigram features of each string, as CSR rows"""
+    vectorizer = HashingVectorizer(n_features=n_features, ngram_range=(1, 2), alternate_sign=False)
+    return vectorizer.transform(np.asarray(values, dtype=str))
+
+
+def matrix_nbytes(matrix):
+    """Memory held by a dense frame/array or a CSR matrix"""
+    if sp.issparse(matrix):
+        return int(matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes)
+    if isinstance(matrix, pd.DataFrame):
+        return int(matrix.memory_usage(deep=True).sum())
+    return int(np.asarray(matrix).nbytes)
+
+
+def fit_pca(X, variance=0.95, max_components=50, batch_rows=100000, random_state=42):
+    """Fit PCA and pick the fewest components explaining `variance`, at most max_components.
+
+    Uses randomized SVD when the matrix fits comfortably in memory and
+    IncrementalPCA over row batches beyond `batch_rows` rows. Returns the
+    fitted PCA and the number of leading components to keep.
+    """
+    n_components = max(1, min(max_components, X.shape[1], X.shape[0]))
+    if len(X) > batch_rows:
+        pca = IncrementalPCA(n_components=n_components, batch_size=max(n_components, batch_rows // 10)).fit(X)
+    else:
+        pca = PCA(n_components=n_components, svd_solver='randomized', random_state=random_state).fit(X)
+    cumulative = np.cumsum(pca.explained_variance_ratio_)
+    return pca, int(min(n_components, np.searchsorted(cumulative, variance) + 1))
+
+
+class SparseDesign:
+    """Layout of the sparse CSR design matrix, fit on the training rows.
+
+    Numeric columns are standardized into one block. Each label-encoded
+    categorical adds one indicator per level, or hashed n-gram features of
+    its original strings when it holds free text or more than
+    max_onehot_levels levels. A column's block is built once over its
+    distinct levels and rows are gathered from it by code; codes unseen at
+    fit time map to an all-zero row. Columns that are empty on the training
+    rows (unused hash buckets, absent levels) are dropped.
+    """
+
+    def __init__(self, categorical_columns=(), label_encoders=None, max_onehot_levels=1000, n_hash_features=2 ** 12):
+        self.categorical_columns = list(categorical_columns)
+        self.label_encoders = label_encoders or {}
+        self.max_onehot_levels = max_onehot_levels
+        self.n_hash_features = n_hash_features
+
+    def fit(self, X):
+        categorical = [col for col in self.categorical_columns if col in X.columns]
+        self.numeric_columns_ = [col for col in X.columns if col not in categorical]
+        self.scaler_ = StandardScaler().fit(X[self.numeric_columns_]) if self.numeric_columns_ else None
+
+        self.levels_ = {}
+        self.blocks_ = {}
+        self.encodings_ = {}
+        for col in categorical:
+            encoder = self.label_encoders.get(col)
+            if encoder is not None:
+                codes, values = np.arange(len(encoder.classes_)), encoder.classes_
+            else:
+                codes = np.unique(X[col])
+                values = codes
+            if is_text(values) or len(codes) > self.max_onehot_levels:
+                self.encodings_[col] = 'hashed'
+                block = sp.vstack([hashed_ngrams(values, self.n_hash_features), sp.csr_matrix((1, self.n_hash_features))])
+            else:
+                self.encodings_[col] = 'onehot'
+                block = sp.eye(len(codes) + 1, len(codes), format='csr')
+            self.levels_[col] = codes
+            self.blocks_[col] = block.tocsr()
+
+        self.active_columns_ = None
+        self.active_columns_ = np.flatnonzero(self.transform(X).getnnz(axis=0))
+        return self
+
+    def _positions(self, col, values):
+        codes = self.levels_[col]
+        positions = np.searchsorted(codes, values)
+        known = positions < len(codes)
+        known[known] = codes[positions[known]] == values[known]
+        positions[~known] = len(codes)
+        return positions
+
+    def transform(self, X):
+        blocks = []
+        if self.scaler_ is not None:
+            blocks.append(sp.csr_matrix(self.scaler_.transform(X[self.numeric_columns_])))
+        for col, block in self.blocks_.items():
+            blocks.append(block[self._positions(col, np.asarray(X[col]))])
+        design = sp.hstack(blocks, format='csr')
+        return design if self.active_columns_ is None else design[:, self.active_columns_]
+
+
+class FeatureViews:
+    """Feature representations of one split, built on first use and memoized.
+
+    The representations form a small graph: 'raw' is the preprocessed frame,
+    'scaled' standardizes it, 'expanded' one-hot encodes the low-cardinality
+    categoricals and 'onehot' standardizes that. 'sparse' is the CSR design
+    matrix of SparseDesign and 'projected' a standardized truncated SVD of
+    it for models that need dense input. 'pca' holds the leading principal
+    components of the scaled view. Asking for a view builds only the
+    transforms on its path, once. X_test may be None when there is no
+    separate evaluation split (cross-validation).
+    """
+
+    BUILD_ORDER = {'scaled': 'raw', 'expanded': 'raw', 'onehot': 'expanded', 'sparse': 'raw', 'projected': 'sparse',
+                   'pca': 'scaled'}
+
+    def __init__(self, X_train, X_test=None, categorical_columns=(), scaler=None, max_onehot_levels=20,
+                 label_encoders=None, n_components=50, pca_variance=0.95, pca_components=50):
+        self.categorical_columns = list(categorical_columns)
+        self.scaler = scaler if scaler is not None else StandardScaler()
+        self.max_onehot_levels = max_onehot_levels
+        self.label_encoders = label_encoders or {}
+        self.n_components = n_components
+        self.pca_variance = pca_variance
+        self.pca_components = pca_components
+        self.sparse_design = None
+        self.pca = None
+        self.pca_kept = 0
+        self.views = {'raw': (X_train, X_test)}
+        self.timings = {}
+
+    def get(self, representation):
+        if representation not in self.views:
+            self.get(self.BUILD_ORDER[representation])
+            started = time.perf_counter()
+            self.views[representation] = getattr(self, f'_build_{representation}')()
+            self.timings[representation] = time.perf_counter() - started
+        return self.views[representation]
+
+    def train(self, representation):
+        return self.get(representation)[0]
+
+    def test(self, representation):
+        return self.get(representation)[1]
+
+    def _standardize(self, scaler, train, test):
+        return scaler.fit_transform(train), (scaler.transform(test) if test is not None else None)
+
+    def _build_scaled(self):
+        return self._standardize(self.scaler, *self.views['raw'])
+
+    def _build_expanded(self):
+        train, test = self.views['raw']
+        levels = onehot_levels(train, self.categorical_columns, self.max_onehot_levels)
+        if not levels:
+            return train, test
+        return expand_onehot(train, levels), (expand_onehot(test, levels) if test is not None else None)
+
+    def _build_onehot(self):
+        # Without categoricals to expand, the one-hot view is the scaled view
+        if self.views['expanded'][0] is self.views['raw'][0]:
+            return self.get('scaled')
+        return self._standardize(StandardScaler(), *self.views['expanded'])
+
+    def _build_sparse(self):
+        train, test = self.views['raw']
+        self.sparse_design = SparseDesign(self.categorical_columns, self.label_encoders).fit(train)
+        return self.sparse_design.transform(train), (self.sparse_design.transform(test) if test is not None else None)
+
+    def _build_projected(self):
+        train, test = self.views['sparse']
+        if train.shape[1] <= self.n_components:
+            # Already narrow enough: densify instead of projecting
+            return self._standardize(StandardScaler(), train.toarray(), test.toarray() if test is not None else None)
+        svd = TruncatedSVD(n_components=self.n_components, random_state=42)
+        projected_train = svd.fit_transform(train)
+        return self._standardize(StandardScaler(), projected_train, svd.transform(test) if test is not None else None)
+
+    def _build_pca(self):
+        train, test = self.views['scaled']
+        self.pca, self.pca_kept = fit_pca(train, self.pca_variance, self.pca_components)
+        return self._reduce(train), (self._reduce(test) if test is not None else None)
+
+    def _reduce(self, X):
+        return self.pca.transform(X)[:, :self.pca_kept]
+
+    def report(self):
+        report = {
+            'computed': list(self.views),
+            'timings': {name: float(seconds) for name, seconds in self.timings.items()},
+            'memory_bytes': {name: matrix_nbytes(train) for name, (train, _) in self.views.items()}
+        }
+        if self.sparse_design is not None:
+            report['sparse_encodings'] = self.sparse_design.encodings_
+            report['sparse_shape'] = list(self.views['sparse'][0].shape)
+        if self.pca is not None:
+            report['pca'] = {
+                'solver': type(self.pca).__name__,
+                'input_dims': int(self.pca.n_features_in_),
+                'n_components': self.pca_kept,
+                'explained_variance': float(np.sum(self.pca.explained_variance_ratio_[:self.pca_kept]))
+            }
+        return report
@@ -0,0 +1,41 @@
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+
+def grow_forest(X, y, step=25, max_trees=500, tol=0.002, patience=2, random_state=42, n_jobs=-1):
+    """Grow a random forest in warm-start increments until the OOB score plateaus.
+
+    Each increment adds `step` trees to the already fitted ones. Growth stops
+    once `patience` consecutive increments improve the OOB accuracy by no more
+    than `tol`, or at `max_trees`. Returns the forest and the growth trace.
+    """
+    forest = RandomForestClassifier(n_estimators=step, warm_start=True, oob_score=True,
+                                    random_state=random_state, n_jobs=n_jobs)
+    trace = []
+    best_score = -np.inf
+    stale = 0
+    while True:
+        forest.fit(X, y)
+        score = float(forest.oob_score_)
+        trace.append({'n_estimators': forest.n_estimators, 'oob_score': score})
+
+        if score > best_score + tol:
+            best_score = score
+            stale = 0
+        else:
+            stale += 1
+        if stale >= patience or forest.n_estimators >= max_trees:
+            break
+        forest.set_params(n_estimators=min(max_trees, forest.n_estimators + step))
+
+    return forest, trace
+
+
+def oob_predictions(forest):
+    """Out-of-bag class predictions and probabilities for every training row"""
+    proba = np.nan_to_num(forest.oob_decision_function_, nan=0.0)
+
+    # Rows that were never out of bag get a uniform distribution
+    missing = proba.sum(axis=1) == 0
+    proba[missing] = 1.0 / proba.shape[1]
+    return forest.classes_[np.argmax(proba, axis=1)], proba
@@ -0,0 +1,71 @@
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.neighbors import NearestNeighbors
+
+
+def cumulative_votes(neighbor_codes, n_classes):
+    """Class vote counts among the first k neighbours, for every k at once.
+
+    neighbor_codes is (n_queries, k_max) class codes ordered by distance; the
+    result is (n_queries, k_max, n_classes) where [:, k - 1] holds the votes
+    of the k nearest neighbours.
+    """
+    return np.cumsum(np.eye(n_classes, dtype=np.int32)[neighbor_codes], axis=1)
+
+
+def accuracy_by_k(votes, y_codes):
+    """Accuracy of the majority vote for each k from cumulative votes"""
+    predictions = np.argmax(votes, axis=2)
+    return (predictions == y_codes[:, None]).mean(axis=0)
+
+
+class KNNSweepClassifier(ClassifierMixin, BaseEstimator):
+    """K-nearest neighbours that picks k from a single neighbour graph.
+
+    fit() indexes the training set with a KD-tree (low dimensionality) or a
+    ball tree, then runs one leave-one-out k_max-neighbour query over the
+    training rows and scores every k from 1 to k_max from it. The k with the
+    best leave-one-out accuracy is used for prediction. Ties in the vote go
+    to the lowest class, as in KNeighborsClassifier.
+    """
+
+    def __init__(self, k_max=25, max_tree_dims=15):
+        self.k_max = k_max
+        self.max_tree_dims = max_tree_dims
+
+    def fit(self, X, y):
+        X = np.asarray(X, dtype=float)
+        self.classes_, self.y_codes_ = np.unique(np.asarray(y), return_inverse=True)
+        self.algorithm_ = 'kd_tree' if X.shape[1] <= self.max_tree_dims else 'ball_tree'
+        self.k_max_ = max(1, min(self.k_max, len(X) - 1))
+        self.index_ = NearestNeighbors(n_neighbors=self.k_max_, algorithm=self.algorithm_).fit(X)
+
+        # Leave-one-out graph: kneighbors() without X excludes each row itself
+        _, neighbors = self.index_.kneighbors()
+        votes = cumulative_votes(self.y_codes_[neighbors], len(self.classes_))
+        self.k_scores_ = accuracy_by_k(votes, self.y_codes_)
+        self.best_k_ = int(np.argmax(self.k_scores_)) + 1
+        return self
+
+    def _votes(self, X):
+        _, neighbors = self.index_.kneighbors(np.asarray(X, dtype=float))
+        return cumulative_votes(self.y_codes_[neighbors], len(self.classes_))
+
+    def predict_proba(self, X):
+        return self._votes(X)[:, self.best_k_ - 1, :] / self.best_k_
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def k_sweep(self, X, y):
+        """Score every k on labelled rows from one k_max query, plus predictions at best_k_"""
+        votes = self._votes(X)
+        y_codes = np.searchsorted(self.classes_, np.asarray(y))
+        known = np.isin(np.asarray(y), self.classes_)
+        scores = (np.argmax(votes, axis=2) == np.where(known, y_codes, -1)[:, None]).mean(axis=0)
+        probabilities = votes[:, self.best_k_ - 1, :] / self.best_k_
+        return {
+            'predictions': self.classes_[np.argmax(probabilities, axis=1)],
+            'probabilities': probabilities,
+            'scores': scores
+        }
@@ -0,0 +1,89 @@
+import time
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.metrics import log_loss
+from sklearn.model_selection import train_test_split
+from sklearn.neural_network import MLPClassifier
+
+
+def batch_size_for(n_rows, batches_per_epoch=50, min_size=32, max_size=512):
+    """Power-of-two minibatch size giving roughly `batches_per_epoch` updates per epoch"""
+    target = max(1, n_rows / batches_per_epoch)
+    return int(np.clip(2 ** round(np.log2(target)), min_size, max_size))
+
+
+class EarlyStoppingMLPClassifier(ClassifierMixin, BaseEstimator):
+    """MLP trained epoch by epoch with validation-based early stopping.
+
+    Each epoch is one partial_fit pass, timed and scored on a held-out
+    validation split. Training stops after `patience` epochs without a
+    validation log-loss improvement, and the best weights seen are restored.
+    The per-epoch trace is kept on `epoch_trace_`.
+    """
+
+    def __init__(self, hidden_layer_sizes=(100, 50), alpha=1e-4, learning_rate_init=1e-3, max_epochs=200,
+                 patience=10, tol=1e-4, validation_fraction=0.1, batch_size='auto', use_float32=False, random_state=42):
+        self.hidden_layer_sizes = hidden_layer_sizes
+        self.alpha = alpha
+        self.learning_rate_init = learning_rate_init
+        self.max_epochs = max_epochs
+        self.patience = patience
+        self.tol = tol
+        self.validation_fraction = validation_fraction
+        self.batch_size = batch_size
+        self.use_float32 = use_float32
+        self.random_state = random_state
+
+    def _cast(self, X):
+        return np.asarray(X, dtype=np.float32 if self.use_float32 else np.float64)
+
+    def fit(self, X, y):
+        X = self._cast(X)
+        y = np.asarray(y)
+        self.classes_ = np.unique(y)
+        _, class_counts = np.unique(y, return_counts=True)
+        stratify = y if class_counts.min() >= 2 else None
+        # A stratified split needs a validation row of every class, which a small upload's 10% may not hold
+        n_valid = max(int(np.ceil(len(y) * self.validation_fraction)), len(self.classes_) if stratify is not None else 1)
+        X_train, X_valid, y_train, y_valid = train_test_split(X, y, test_size=n_valid,
+                                                              random_state=self.random_state, stratify=stratify)
+
+        self.batch_size_ = batch_size_for(len(y_train)) if self.batch_size == 'auto' else self.batch_size
+        self.model_ = MLPClassifier(hidden_layer_sizes=self.hidden_layer_sizes, alpha=self.alpha,
+                                    learning_rate_init=self.learning_rate_init, batch_size=self.batch_size_,
+                                    random_state=self.random_state)
+
+        self.epoch_trace_ = []
+        best_score = -np.inf
+        best_weights = None
+        stale = 0
+        for epoch in range(1, self.max_epochs + 1):
+            started = time.perf_counter()
+            self.model_.partial_fit(X_train, y_train, classes=self.classes_)
+            seconds = time.perf_counter() - started
+            # Validation log-loss is a smoother stopping signal than accuracy on small splits
+            val_loss = float(log_loss(y_valid, self.model_.predict_proba(X_valid), labels=self.classes_))
+            score = -val_loss
+            self.epoch_trace_.append({'epoch': epoch, 'seconds': seconds, 'loss': float(self.model_.loss_),
+                                      'val_loss': val_loss, 'val_score': float(self.model_.score(X_valid, y_valid))})
+
+            if score > best_score + self.tol:
+                best_score = score
+                best_weights = ([w.copy() for w in self.model_.coefs_], [b.copy() for b in self.model_.intercepts_])
+                stale = 0
+            else:
+                stale += 1
+                if stale >= self.patience:
+                    break
+
+        self.model_.coefs_, self.model_.intercepts_ = best_weights
+        self.best_validation_loss_ = -best_score
+        self.n_epochs_ = len(self.epoch_trace_)
+        return self
+
+    def predict_proba(self, X):
+        return self.model_.predict_proba(self._cast(X))
+
+    def predict(self, X):
+        return self.model_.predict(self._cast(X))
@@ -0,0 +1,64 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sklearn.preprocessing import StandardScaler
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pool_workers():
+    """Number of worker processes in the shared pool"""
+    return int(os.environ.get('ML_POOL_WORKERS', 0)) or os.cpu_count() or 1
+
+
+def get_pool():
+    """Process pool shared by every CPU-bound training stage"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=pool_workers())
+    return _pool
+
+
+def shutdown_pool():
+    """Stop the worker processes, if the pool was ever started"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def fit_and_predict(estimator, X, y, train_idx=None, test_idx=None, scale=True):
+    """Fit one estimator on the train rows and predict the test rows.
+
+    Runs inside a pool worker, so estimators are pinned to one thread to
+    avoid oversubscribing the cores the pool already fans out over. Returns
+    the fitted estimator only when there is nothing to predict.
+    """
+    if 'n_jobs' in estimator.get_params():
+        estimator.set_params(n_jobs=1)
+
+    X_train = X if train_idx is None else X[train_idx]
+    y_train = y if train_idx is None else y[train_idx]
+    scaler = StandardScaler() if scale else None
+    if scaler is not None:
+        X_train = scaler.fit_transform(X_train)
+    started = time.perf_counter()
+    estimator.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - started
+
+    if test_idx is None:
+        return {'model': estimator}
+
+    X_test = X[test_idx]
+    if scaler is not None:
+        X_test = scaler.transform(X_test)
+    return {
+        'classes': estimator.classes_,
+        'fit_seconds': fit_seconds,
+        'predictions': estimator.predict(X_test),
+        'probabilities': estimator.predict_proba(X_test) if hasattr(estimator, 'predict_proba') else None
+    }
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+
+
+def param_digest(value):
+    """Stable digest of a stage parameter; raw bytes are hashed by content"""
+    if isinstance(value, (bytes, bytearray)):
+        return hashlib.sha1(value).hexdigest()
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+class Pipeline:
+    """Small DAG of named stages whose outputs are memoized by content.
+
+    A stage's cache key hashes its name, the keys of the stages it depends on
+    and the values of the parameters it declares, so a changed parameter
+    invalidates that stage and everything downstream of it, while stages that
+    do not depend on it are answered from the cache. Stages must be
+    deterministic and must not mutate their inputs. The cache keeps the
+    `max_entries` most recently used outputs and, given a `sizeof` function,
+    drops the least recently used while their measured size exceeds
+    `max_bytes`; the output just stored is never dropped to make room for
+    itself. It is safe to share between threads running their own
+    PipelineRun: a stage already being computed under the same key by
+    another run is waited for rather than recomputed.
+    """
+
+    def __init__(self, max_entries=32, max_bytes=None, sizeof=None):
+        self.stages = {}
+        self.cache = OrderedDict()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.sizes = {}
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.in_flight = {}
+
+    def stage(self, name, deps=(), params=()):
+        """Register a function as a stage; it is called as func(context, *dep_outputs, **params)"""
+        def register(func):
+            self.stages[name] = (func, tuple(deps), tuple(params))
+            return func
+        return register
+
+    def start(self, params, context=None):
+        return PipelineRun(self, params, context)
+
+    def _resolve(self, key, compute, guard=nullcontext):
+        """Output for a key and how it was obtained: 'hit', 'shared' (joined another run's computation) or 'miss'.
+
+        Only the run that computes the key enters `guard()`, after claiming
+        the key, so runs needing the same key wait for it rather than for
+        the guard. An error raised by the guard reaches them as well.
+        """
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key], 'hit'
+            flight = self.in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.in_flight[key] = Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.output, 'shared'
+
+        try:
+            with guard():
+                flight.output = compute()
+            self._store(key, flight.output)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            flight.done.set()
+        return flight.output, 'miss'
+
+    def _store(self, key, output):
+        nbytes = self.sizeof(output) if self.sizeof else 0
+        with self.lock:
+            self._drop(key)
+            self.cache[key] = output
+            self.sizes[key] = nbytes
+            self.total_bytes += nbytes
+            while len(self.cache) > 1 and (len(self.cache) > self.max_entries
+                                           or (self.max_bytes is not None and self.total_bytes > self.max_bytes)):
+                self._drop(next(iter(self.cache)))
+
+    def _drop(self, key):
+        if key in self.cache:
+            del self.cache[key]
+            self.total_bytes -= self.sizes.pop(key)
+
+
+class Flight:
+    """A stage computation in progress, which runs needing the same key wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.output = None
+        self.error = None
+
+
+class PipelineRun:
+    """One pass over a pipeline: stages are resolved on demand and reported once"""
+
+    def __init__(self, pipeline, params, context=None):
+        self.pipeline = pipeline
+        self.params = params
+        self.context = context
+        self.keys = {}
+        self.outputs = {}
+        self.report = []
+
+    def key(self, name):
+        """Cache key of a stage, resolving the stages it depends on but not the stage itself"""
+        if name not in self.keys:
+            _, deps, param_names = self.pipeline.stages[name]
+            digest = hashlib.sha1(name.encode())
+            for dep in deps:
+                self.get(dep)
+                digest.update(self.keys[dep].encode())
+            for param in param_names:
+                digest.update(f'{param}={param_digest(self.params.get(param))}'.encode())
+            self.keys[name] = digest.hexdigest()
+        return self.keys[name]
+
+    def get(self, name, guard=nullcontext):
+        """Output of a stage; `guard` is a context manager factory entered around computing it (not on a hit or a shared result)"""
+        if name not in self.outputs:
+            func, deps, param_names = self.pipeline.stages[name]
+            key = self.key(name)
+            inputs = [self.outputs[dep] for dep in deps]
+            kwargs = {param: self.params.get(param) for param in param_names}
+
+            started = time.perf_counter()
+            output, status = self.pipeline._resolve(key, lambda: func(self.context, *inputs, **kwargs), guard)
+            self.outputs[name] = output
+            self.report.append({'stage': name, 'status': status, 'seconds': time.perf_counter() - started})
+        return self.outputs[name]
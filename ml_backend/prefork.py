@@ -0,0 +1,240 @@
+import gc
+import os
+import random
+import signal
+import socket
+import sys
+import time
+import traceback
+
+from werkzeug.serving import make_server
+
+
+def process_memory(pid):
+    """Resident memory of a process in bytes, split into shared and private pages where Linux reports it.
+
+    Pages a forked worker still shares copy-on-write with the master count
+    as shared; PSS charges each shared page to its processes pro rata.
+    Returns None where /proc is unavailable.
+    """
+    fields = {'Rss': 'rss', 'Pss': 'pss', 'Shared_Clean': 'shared', 'Shared_Dirty': 'shared',
+              'Private_Clean': 'private', 'Private_Dirty': 'private'}
+    memory = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                if name in fields:
+                    memory[fields[name]] = memory.get(fields[name], 0) + int(value.split()[0]) * 1024
+    except OSError:
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        memory['rss'] = int(line.split()[1]) * 1024
+        except OSError:
+            return None
+    return memory or None
+
+
+def shutdown_worker_pool():
+    """Stop the shared training process pool of this process, if it imported and started one"""
+    parallel = sys.modules.get('parallel')
+    if parallel is not None:
+        parallel.shutdown_pool()
+
+
+def format_memory(memory):
+    if memory is None:
+        return 'memory unavailable'
+    parts = [f"rss {memory['rss'] / 2**20:.1f} MB"]
+    if 'shared' in memory:
+        parts.append(f"shared {memory['shared'] / 2**20:.1f} MB, private {memory['private'] / 2**20:.1f} MB, "
+                     f"pss {memory['pss'] / 2**20:.1f} MB")
+    return ', '.join(parts)
+
+
+class PreforkServer:
+    """Pre-forking WSGI server: preload once in the master, then fork workers sharing that state copy-on-write.
+
+    Workers accept on one listening socket and serve a request at a time.
+    A worker exits after `max_requests` (plus jitter, so workers do not all
+    recycle together) and the master forks a fresh one. SIGHUP recycles every
+    worker gracefully; SIGTERM or SIGINT lets in-flight requests finish, up
+    to `graceful_timeout` seconds, then stops. SIGUSR1 logs worker memory,
+    which is also logged every `report_interval` seconds.
+    """
+
+    def __init__(self, app, host='127.0.0.1', port=5000, workers=2, preload=(), max_requests=1000,
+                 max_requests_jitter=50, graceful_timeout=30, report_interval=300):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.n_workers = workers
+        self.preload = preload
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.report_interval = report_interval
+        self.workers = {}
+        self.socket = None
+        self.running = False
+        self.reload_requested = False
+        self.report_requested = False
+        self.served = 0
+
+    def log(self, message):
+        print(f'[prefork {os.getpid()}] {message}', file=sys.stderr, flush=True)
+
+    # Master
+
+    def serve_forever(self):
+        started = time.perf_counter()
+        for hook in self.preload:
+            hook()
+        # Objects that exist now are shared by every worker; keep the cyclic GC from
+        # touching (and so copying) their pages in the workers
+        gc.collect()
+        gc.freeze()
+        self.log(f'preloaded in {time.perf_counter() - started:.2f}s, {format_memory(process_memory(os.getpid()))}')
+
+        self.socket = socket.create_server((self.host, self.port), reuse_port=False, backlog=128)
+        self.socket.set_inheritable(True)
+        self.running = True
+        signal.signal(signal.SIGTERM, self.handle_stop)
+        signal.signal(signal.SIGINT, self.handle_stop)
+        signal.signal(signal.SIGHUP, self.handle_reload)
+        signal.signal(signal.SIGUSR1, self.handle_report)
+        self.log(f'listening on http://{self.host}:{self.port} with {self.n_workers} workers')
+
+        for _ in range(self.n_workers):
+            self.spawn_worker()
+        last_report = time.monotonic()
+        try:
+            while self.running:
+                self.reap_workers()
+                if self.reload_requested:
+                    self.reload_requested = False
+                    self.recycle_all()
+                while self.running and len(self.workers) < self.n_workers:
+                    self.spawn_worker()
+                if self.report_requested or time.monotonic() - last_report >= self.report_interval:
+                    self.report_requested = False
+                    last_report = time.monotonic()
+                    self.report()
+                time.sleep(0.5)
+        finally:
+            self.stop_workers()
+            self.socket.close()
+
+    def spawn_worker(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                try:
+                    code = self.run_worker()
+                finally:
+                    # os._exit skips interpreter cleanup, so the worker's process pool would outlive it
+                    shutdown_worker_pool()
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+        self.log(f'started worker {pid}')
+        return pid
+
+    def reap_workers(self):
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started = self.workers.pop(pid, None)
+            if started is None:
+                # Not a worker: a process pool or other child forked by the app
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            reason = 'exited' if code == 0 else f'died with exit code {code}'
+            self.log(f'worker {pid} {reason} after {time.monotonic() - started:.0f}s')
+
+    def recycle_all(self):
+        """Replace the workers one at a time, starting each replacement before stopping the old one"""
+        for pid in list(self.workers):
+            self.spawn_worker()
+            os.kill(pid, signal.SIGTERM)
+
+    def stop_workers(self):
+        for pid in self.workers:
+            os.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.workers and time.monotonic() < deadline:
+            self.reap_workers()
+            time.sleep(0.1)
+        for pid in self.workers:
+            self.log(f'worker {pid} did not stop within {self.graceful_timeout}s; killing it')
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self.workers = {}
+
+    def report(self):
+        """Log the master's and every worker's memory"""
+        self.log(f'master {os.getpid()}: {format_memory(process_memory(os.getpid()))}')
+        for pid, started in self.workers.items():
+            self.log(f'worker {pid} (up {time.monotonic() - started:.0f}s): {format_memory(process_memory(pid))}')
+
+    def handle_stop(self, signum, frame):
+        self.running = False
+
+    def handle_reload(self, signum, frame):
+        self.reload_requested = True
+
+    def handle_report(self, signum, frame):
+        self.report_requested = True
+
+    # Worker
+
+    def run_worker(self):
+        self.running = True
+        signal.signal(signal.SIGTERM, self.handle_stop)
+        # Ctrl-C and hangups reach the whole process group; the master decides when workers stop
+        for signum in (signal.SIGINT, signal.SIGHUP, signal.SIGUSR1):
+            signal.signal(signum, signal.SIG_IGN)
+        self.workers = {}
+        random.seed()
+
+        server = make_server(self.host, self.port, self.app, fd=self.socket.fileno())
+        # Every idle worker wakes on a new connection; the losers of the accept race
+        # get EAGAIN instead of blocking until the next connection
+        server.socket.setblocking(False)
+        # Wake up regularly to notice a stop request between requests
+        server.timeout = 1
+        # Only connections this worker accepted and handled count; timeouts and lost accept races do not
+        process_request = server.process_request
+
+        def process_and_count(request, client_address):
+            try:
+                process_request(request, client_address)
+            finally:
+                self.served += 1
+        server.process_request = process_and_count
+
+        limit = self.max_requests + random.randint(0, self.max_requests_jitter) if self.max_requests else None
+        self.served = 0
+        while self.running and (limit is None or self.served < limit):
+            server.handle_request()
+        return 0
+
+
+def serve(app, host='127.0.0.1', port=5000, workers=2, preload=(), **options):
+    """Run `app` on a prefork server, or the development server where fork is unavailable"""
+    if not hasattr(os, 'fork'):
+        print('Prefork mode needs os.fork; falling back to the development server', file=sys.stderr)
+        app.run(host=host, port=port)
+        return
+    # Each worker trains on its own process pool; split the cores between them
+    os.environ.setdefault('ML_POOL_WORKERS', str(max(1, (os.cpu_count() or 1) // workers)))
+    PreforkServer(app, host, port, workers, preload, **options).serve_forever()
@@ -0,0 +1,66 @@
+import gzip
+
+from flask import Response, jsonify, request
+
+# Optional brotli support; gzip is always available
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/plain', 'text/html', 'text/csv'}
+ENCODING_SUFFIXES = {'br': 'br', 'gzip': 'gz'}
+
+
+def negotiate_encoding():
+    """Best compression the client accepts, by its Accept-Encoding weights"""
+    offers = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return request.accept_encodings.best_match(offers)
+
+
+def compress_response(response, min_size=1024, gzip_level=6, brotli_quality=5):
+    """after_request hook compressing sizeable JSON/text bodies as the client allows.
+
+    A strong ETag on the response gets an encoding suffix, since the
+    compressed bytes are a different representation of the same resource.
+    """
+    if (response.status_code != 200 or response.direct_passthrough or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    encoding = negotiate_encoding()
+    if len(data) < min_size or encoding is None:
+        return response
+
+    if encoding == 'br':
+        data = brotli.compress(data, quality=brotli_quality)
+    else:
+        data = gzip.compress(data, compresslevel=gzip_level)
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f'{etag}-{ENCODING_SUFFIXES[encoding]}')
+    return response
+
+
+def conditional_json(etag, payload):
+    """JSON response tagged with a weak `etag`, or 304 before any serialization when the client has it.
+
+    The tag names the inputs the payload was computed from, not its bytes:
+    a recomputation (another worker, a restart) can differ in timings, so
+    it is weak, compared as If-None-Match does and left alone by
+    compression. `payload` may be a function returning it, so a 304 skips
+    building it too.
+    """
+    if etag and request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag, weak=True)
+        response.vary.add('Accept-Encoding')
+        return response
+    response = jsonify(payload() if callable(payload) else payload)
+    if etag:
+        response.set_etag(etag, weak=True)
+    return response
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import ExtraTreesClassifier
+from sklearn.feature_selection import f_classif
+
+# How columns are scored against the target
+METHODS = ('univariate', 'forest')
+
+
+def near_constant_columns(X, max_share=0.99):
+    """Columns whose most frequent value covers at least `max_share` of the rows"""
+    dropped = []
+    for col in X.columns:
+        _, counts = np.unique(X[col].to_numpy(), return_counts=True)
+        if counts.max() >= max_share * len(X):
+            dropped.append(col)
+    return dropped
+
+
+def duplicate_columns(X):
+    """Columns identical to an earlier column, mapped to that column"""
+    first_seen = {}
+    duplicates = {}
+    for col in X.columns:
+        values = np.ascontiguousarray(X[col].to_numpy())
+        key = (values.dtype.str, values.tobytes())
+        if key in first_seen:
+            duplicates[col] = first_seen[key]
+        else:
+            first_seen[key] = col
+    return duplicates
+
+
+def correlation_matrix(X, known=None):
+    """Absolute column correlations, reusing known pairs from a column-keyed correlation dict.
+
+    Pairs among columns present in `known` (analyze_dataset's correlation
+    output) are taken from it; only rows for the remaining columns are
+    computed, as one product of the standardized matrix.
+    """
+    columns = list(X.columns)
+    known = pd.DataFrame(known) if known else pd.DataFrame()
+    covered = [col for col in columns if col in known.index and col in known.columns]
+    missing = [col for col in columns if col not in covered]
+
+    corr = pd.DataFrame(np.nan, index=columns, columns=columns)
+    if covered:
+        corr.loc[covered, covered] = known.loc[covered, covered].to_numpy()
+    if missing:
+        values = X.to_numpy(dtype=float)
+        std = values.std(axis=0)
+        Z = (values - values.mean(axis=0)) / np.where(std > 0, std, 1)
+        block = Z[:, [columns.index(col) for col in missing]].T @ Z / len(Z)
+        corr.loc[missing, :] = block
+        corr.loc[:, missing] = block.T
+    return corr.abs().fillna(0.0)
+
+
+def feature_scores(X, y, method='univariate', random_state=42):
+    """Relevance of each column to the target: ANOVA F-scores or tiny-forest importances"""
+    if method == 'forest':
+        forest = ExtraTreesClassifier(n_estimators=25, max_depth=8, random_state=random_state, n_jobs=-1)
+        scores = forest.fit(X, y).feature_importances_
+    else:
+        scores, _ = f_classif(X, y)
+    return pd.Series(np.nan_to_num(scores, nan=0.0), index=X.columns)
+
+
+def select_features(X, y, correlation=None, method='univariate', max_features=50, collinearity=0.98, max_share=0.99):
+    """Drop uninformative and redundant columns, then keep the best `max_features` by score.
+
+    Near-constant and duplicate columns go first. The rest are scored, and
+    walked from the best score down: a column is dropped when it correlates
+    above `collinearity` with one already kept, or once `max_features` are
+    kept. Without a target (`y` None) only these label-free filters run:
+    columns are walked in their original order and none is dropped for
+    `max_features`. Returns the kept columns in their original order and a
+    report of every dropped column with its reason.
+    """
+    method = method if y is not None else 'unsupervised'
+    dropped = {col: 'near_constant' for col in near_constant_columns(X, max_share)}
+    remaining = X.drop(columns=list(dropped))
+    for col, original in duplicate_columns(remaining).items():
+        dropped[col] = f'duplicate of {original}'
+    remaining = remaining.drop(columns=[col for col in remaining.columns if col in dropped])
+
+    if remaining.shape[1] == 0:
+        # Nothing informative survived the filters; leave the columns untouched
+        return list(X.columns), {'method': method, 'n_input': X.shape[1], 'n_selected': X.shape[1],
+                                 'selected': list(X.columns), 'dropped': {}, 'scores': {}}
+
+    scores = feature_scores(remaining, y, method) if y is not None else pd.Series(0.0, index=remaining.columns)
+    corr = correlation_matrix(remaining, correlation).to_numpy()
+    columns = list(remaining.columns)
+    kept = []
+    for i in np.argsort(-scores.to_numpy(), kind='stable'):
+        if y is not None and len(kept) >= max_features:
+            dropped[columns[i]] = f'beyond max_features={max_features}'
+            continue
+        if kept:
+            partner = kept[int(np.argmax(corr[i, kept]))]
+            if corr[i, partner] > collinearity:
+                dropped[columns[i]] = f'collinear with {columns[partner]} (|r|={corr[i, partner]:.3f})'
+                continue
+        kept.append(i)
+
+    kept_columns = {columns[i] for i in kept}
+    selected = [col for col in X.columns if col in kept_columns]
+    report = {
+        'method': method,
+        'n_input': X.shape[1],
+        'n_selected': len(selected),
+        'selected': selected,
+        'dropped': dropped,
+        'scores': {col: float(score) for col, score in scores.items()} if y is not None else {}
+    }
+    return selected, report
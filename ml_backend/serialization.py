@@ -0,0 +1,72 @@
+import json
+
+import numpy as np
+import pandas as pd
+from flask.json.provider import DefaultJSONProvider
+
+# Optional fast backend; the standard library encoder is used without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def to_builtin(obj):
+    """JSON-ready form of a value the encoder cannot handle natively.
+
+    Called by the encoder only for objects it does not know, so plain
+    Python containers and scalars never pass through here.
+    """
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return float(obj)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict()
+    if isinstance(obj, pd.Series):
+        return obj.to_dict()
+    if isinstance(obj, pd.Index):
+        return obj.tolist()
+    if isinstance(obj, (pd.Timestamp, np.datetime64, np.timedelta64)):
+        return str(obj)
+    if isinstance(obj, (np.dtype, pd.api.extensions.ExtensionDtype)):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, 'get_params'):
+        # Fitted estimators in model results are reported by class name
+        return type(obj).__name__
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def dumps(obj, sort_keys=False, indent=None, fast=True):
+    """Encode a payload in a single pass, with orjson when it is installed"""
+    if fast and orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=to_builtin, option=option).decode()
+    return json.dumps(obj, default=to_builtin, sort_keys=sort_keys, indent=indent)
+
+
+class NumpyJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes NumPy and pandas values directly.
+
+    Install with `app.json = NumpyJSONProvider(app)`; jsonify() then encodes
+    responses without a separate conversion pass.
+    """
+
+    default = staticmethod(to_builtin)
+    fast = True
+
+    def dumps(self, obj, **kwargs):
+        # response() passes indent (debug) or compact separators; anything else goes to the stdlib path
+        if set(kwargs) <= {'indent', 'sort_keys', 'separators'}:
+            return dumps(obj, kwargs.get('sort_keys', self.sort_keys), kwargs.get('indent'), self.fast)
+        return super().dumps(obj, **kwargs)
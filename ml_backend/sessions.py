@@ -0,0 +1,261 @@
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def deep_nbytes(obj, exclude=()):
+    """Approximate bytes held by an object graph: arrays, frames, containers and object attributes.
+
+    Each object is counted once. Objects in `exclude` (e.g. a cache shared by
+    every session) are not entered. Types with their own `__getstate__` are
+    measured through it, which covers data kept outside `__dict__` such as
+    fitted trees and XGBoost boosters.
+    """
+    seen = {id(item) for item in exclude}
+    # States from __getstate__ are new objects; holding them keeps their ids from being reused
+    states = []
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or item is None or isinstance(item, (type, type(sys), bool, int, float)) or callable(item):
+            continue
+        seen.add(id(item))
+        if isinstance(item, np.ndarray):
+            total += item.nbytes
+            if item.dtype == object:
+                stack.extend(item.ravel())
+        elif isinstance(item, (pd.DataFrame, pd.Series, pd.Index)):
+            total += int(np.sum(item.memory_usage(deep=True)))
+        elif isinstance(item, (str, bytes, bytearray)):
+            total += sys.getsizeof(item)
+        elif isinstance(item, dict):
+            total += sys.getsizeof(item)
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            total += sys.getsizeof(item)
+            stack.extend(item)
+        elif type(item).__getstate__ is not object.__getstate__:
+            total += sys.getsizeof(item)
+            try:
+                states.append(item.__getstate__())
+            except Exception:
+                continue
+            stack.append(states[-1])
+        elif hasattr(item, '__dict__'):
+            total += sys.getsizeof(item)
+            stack.append(vars(item))
+        else:
+            total += sys.getsizeof(item)
+    return total
+
+
+class SessionStore:
+    """Thread-safe LRU store of per-session state, bounded by count, total bytes and idle time.
+
+    A session is dropped once it has been idle for `ttl_seconds`, and the
+    least recently used sessions are dropped while there are more than
+    `max_sessions` or their measured size exceeds `max_bytes`. The session
+    just stored is never evicted to make room for itself. State is measured
+    with `sizeof` when stored; it should not grow afterwards.
+
+    With a `directory`, every stored session is also written there with
+    joblib, so all processes sharing the directory (e.g. prefork workers)
+    see it. Memory is then a per-process cache in front of the files: a
+    session missing from memory, or replaced on disk by another process, is
+    loaded from its file. A file's modification time is the session's last
+    access, and the files are held to the same count, byte and idle limits.
+    """
+
+    ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{8,64}')
+
+    def __init__(self, max_sessions=64, max_bytes=4 * 2**30, ttl_seconds=3600, sizeof=deep_nbytes, directory=None):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.sizeof = sizeof
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.evictions = {'ttl': 0, 'count': 0, 'memory': 0}
+        self.lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def new_id():
+        return secrets.token_urlsafe(16)
+
+    @classmethod
+    def valid_id(cls, session_id):
+        """Whether a client-supplied id can name a session (and its file)"""
+        return bool(session_id) and cls.ID_PATTERN.fullmatch(session_id) is not None
+
+    def get(self, session_id):
+        """State of a live session, refreshing its position and idle time; None if unknown or expired"""
+        if not self.valid_id(session_id):
+            return None
+        stamp = self._file_stamp(session_id)
+        with self.lock:
+            self._expire()
+            entry = self.entries.get(session_id)
+            if entry is not None and entry['stamp'] != stamp:
+                # Replaced or dropped on disk by another process
+                self._remove(session_id)
+                entry = None
+            if entry is not None:
+                entry['last_access'] = time.monotonic()
+                self.entries.move_to_end(session_id)
+                state = entry['state']
+        if entry is None:
+            state = self._read_file(session_id) if stamp is not None else None
+            if state is None:
+                return None
+            self._insert(session_id, state, stamp)
+        if self.directory:
+            self._touch_file(session_id)
+        return state
+
+    def put(self, session_id, state):
+        """Store (or replace) a session's state and evict to stay within the bounds"""
+        stamp = self._write_file(session_id, state) if self.directory else None
+        nbytes = self._insert(session_id, state, stamp)
+        if self.directory:
+            self._prune_files()
+        return nbytes
+
+    def pop(self, session_id):
+        with self.lock:
+            entry = self._remove(session_id)
+        if self.directory and self.valid_id(session_id):
+            self._unlink(self._path(session_id))
+        return entry['state'] if entry else None
+
+    def stats(self):
+        with self.lock:
+            self._expire()
+            stats = {
+                'sessions': len(self.entries),
+                'bytes': self.total_bytes,
+                'max_sessions': self.max_sessions,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'evictions': dict(self.evictions)
+            }
+        if self.directory:
+            files = self._files()
+            stats['stored_sessions'] = len(files)
+            stats['stored_bytes'] = sum(size for _, size, _ in files)
+        return stats
+
+    def _insert(self, session_id, state, stamp):
+        nbytes = self.sizeof(state)
+        with self.lock:
+            self._remove(session_id)
+            self.entries[session_id] = {'state': state, 'nbytes': nbytes, 'stamp': stamp, 'last_access': time.monotonic()}
+            self.total_bytes += nbytes
+            self._expire()
+            while len(self.entries) > 1 and len(self.entries) > self.max_sessions:
+                self._evict('count')
+            while len(self.entries) > 1 and self.total_bytes > self.max_bytes:
+                self._evict('memory')
+        return nbytes
+
+    def _remove(self, session_id):
+        entry = self.entries.pop(session_id, None)
+        if entry is not None:
+            self.total_bytes -= entry['nbytes']
+        return entry
+
+    def _evict(self, reason):
+        _, entry = self.entries.popitem(last=False)
+        self.total_bytes -= entry['nbytes']
+        self.evictions[reason] += 1
+
+    def _expire(self):
+        # Entries are in access order, so the idle ones are at the front
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self.entries and next(iter(self.entries.values()))['last_access'] < cutoff:
+            self._evict('ttl')
+
+    # Session files
+
+    def _path(self, session_id):
+        return os.path.join(self.directory, f'{session_id}.joblib')
+
+    def _file_stamp(self, session_id):
+        """Identity of a live session file, which every put changes; None without one"""
+        if not self.directory:
+            return None
+        path = self._path(session_id)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if time.time() - stat.st_mtime > self.ttl_seconds:
+            self._unlink(path)
+            return None
+        # A put replaces the file, so the inode changes; the size guards against inode reuse
+        return stat.st_ino, stat.st_size
+
+    def _write_file(self, session_id, state):
+        import joblib
+
+        path = self._path(session_id)
+        partial = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        joblib.dump(state, partial)
+        os.replace(partial, path)
+        return self._file_stamp(session_id)
+
+    def _read_file(self, session_id):
+        import joblib
+
+        try:
+            return joblib.load(self._path(session_id))
+        except Exception:
+            # Removed meanwhile, or written by an incompatible version of the code
+            return None
+
+    def _touch_file(self, session_id):
+        try:
+            os.utime(self._path(session_id))
+        except OSError:
+            pass
+
+    def _files(self):
+        """(mtime, size, path) of every session file, most recently used first"""
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.joblib'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        return sorted(files, reverse=True)
+
+    def _prune_files(self):
+        """Delete session files idle past the TTL or beyond the count and byte limits, least recently used first"""
+        now = time.time()
+        total = 0
+        for i, (mtime, size, path) in enumerate(self._files()):
+            total += size
+            if i > 0 and (now - mtime > self.ttl_seconds or i >= self.max_sessions or total > self.max_bytes):
+                self._unlink(path)
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# The backend modules import each other by their flat names, as when run from ml_backend
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the session files app.py sets up at import out of the source tree
+os.environ.setdefault('ML_SESSION_DIR', tempfile.mkdtemp(prefix='ml-sessions-'))
@@ -0,0 +1,147 @@
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+from admission import AdmissionController, QueueFull, estimate_training_cost
+
+fork = pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork')
+
+
+def cost(seconds=10.0, memory=100):
+    return {'cpu_seconds': seconds, 'memory_bytes': memory}
+
+
+def admit_in_thread(controller, job_cost, admitted, release):
+    """Start a thread that takes a slot, records it in `admitted`, and holds it until `release` is set"""
+    def run():
+        with controller.admit(job_cost):
+            admitted.append(job_cost)
+            release.wait(10)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_estimated_cost_grows_with_the_data():
+    small = estimate_training_cost(1000, 10)
+    assert estimate_training_cost(10000, 10)['cpu_seconds'] > small['cpu_seconds']
+    assert estimate_training_cost(1000, 100)['memory_bytes'] > small['memory_bytes']
+    assert estimate_training_cost(1000, 10, cv_folds=5)['cpu_seconds'] > small['cpu_seconds']
+    assert estimate_training_cost(1000, 10, tuning_budget=30)['cpu_seconds'] == pytest.approx(small['cpu_seconds'] + 30)
+
+
+def test_jobs_beyond_max_concurrent_wait_in_order():
+    controller = AdmissionController(max_concurrent=1, max_queue=4)
+    admitted, releases = [], [threading.Event() for _ in range(3)]
+    threads = [admit_in_thread(controller, cost(seconds=1), admitted, releases[0])]
+    wait_until(lambda: len(admitted) == 1)
+    for i in (1, 2):
+        threads.append(admit_in_thread(controller, cost(seconds=i + 1), admitted, releases[i]))
+        wait_until(lambda: controller.stats()['queued'] == i)
+    assert controller.stats()['running'] == 1
+
+    for release in releases:
+        release.set()
+    for thread in threads:
+        thread.join(10)
+    assert [job['cpu_seconds'] for job in admitted] == [1, 2, 3]
+    stats = controller.stats()
+    assert (stats['running'], stats['queued'], stats['admitted'], stats['estimated_wait_seconds']) == (0, 0, 3, 0)
+
+
+def test_full_queue_is_rejected_with_a_retry_estimate():
+    controller = AdmissionController(max_concurrent=1, max_queue=1)
+    admitted, release = [], threading.Event()
+    threads = [admit_in_thread(controller, cost(seconds=20), admitted, release)]
+    wait_until(lambda: admitted)
+    threads.append(admit_in_thread(controller, cost(seconds=20), admitted, release))
+    wait_until(lambda: controller.stats()['queued'] == 1)
+
+    with pytest.raises(QueueFull) as raised:
+        with controller.admit(cost()):
+            pass
+    assert 20 <= raised.value.retry_after <= 40
+    assert controller.stats()['rejected'] == 1
+    release.set()
+    for thread in threads:
+        thread.join(10)
+
+
+def test_memory_budget_holds_back_jobs_that_do_not_fit():
+    controller = AdmissionController(max_concurrent=3, max_queue=4, memory_budget=100)
+    admitted, first_release, second_release = [], threading.Event(), threading.Event()
+    first = admit_in_thread(controller, cost(memory=70), admitted, first_release)
+    wait_until(lambda: admitted)
+    second = admit_in_thread(controller, cost(memory=50), admitted, second_release)
+    wait_until(lambda: controller.stats()['queued'] == 1)
+    assert controller.stats()['memory_in_use'] == 70
+
+    first_release.set()
+    wait_until(lambda: len(admitted) == 2)
+    second_release.set()
+    first.join(10)
+    second.join(10)
+
+
+def test_job_larger_than_the_budget_runs_alone():
+    controller = AdmissionController(max_concurrent=2, memory_budget=100)
+    with controller.admit(cost(memory=500)):
+        assert controller.stats()['running'] == 1
+
+
+def hold_slot_and_die(controller, started):
+    with controller.admit(cost()):
+        started.set()
+        # Exit without leaving the with block, as a killed worker would
+        os._exit(0)
+
+
+@fork
+def test_slot_of_a_dead_process_is_reaped():
+    controller = AdmissionController(max_concurrent=1, max_queue=2)
+    context = multiprocessing.get_context('fork')
+    started = context.Event()
+    process = context.Process(target=hold_slot_and_die, args=(controller, started))
+    process.start()
+    assert started.wait(10)
+    process.join(10)
+
+    with controller.admit(cost()):
+        assert controller.stats()['running'] == 1
+
+
+def hold_slot(controller, started, release):
+    with controller.admit(cost()):
+        started.set()
+        release.wait(10)
+
+
+@fork
+def test_limit_holds_across_forked_processes():
+    controller = AdmissionController(max_concurrent=1, max_queue=2)
+    context = multiprocessing.get_context('fork')
+    started, release = context.Event(), context.Event()
+    process = context.Process(target=hold_slot, args=(controller, started, release))
+    process.start()
+    assert started.wait(10)
+    assert controller.stats()['running'] == 1
+
+    admitted, done = [], threading.Event()
+    done.set()
+    thread = admit_in_thread(controller, cost(), admitted, done)
+    wait_until(lambda: controller.stats()['queued'] == 1)
+    assert not admitted
+    release.set()
+    process.join(10)
+    thread.join(10)
+    assert admitted
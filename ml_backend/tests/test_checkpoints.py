@@ -0,0 +1,116 @@
+import json
+import multiprocessing
+import os
+import threading
+
+import numpy as np
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+from checkpoints import RunCheckpoint, model_config_key
+
+X = np.random.default_rng(0).normal(size=(40, 3))
+y = np.arange(40) % 2
+
+
+def fitted():
+    return DecisionTreeClassifier(random_state=0).fit(X, y)
+
+
+def manifest(run):
+    with open(os.path.join(run.run_dir, 'manifest.json')) as f:
+        return json.load(f)
+
+
+def test_model_is_restored_only_under_its_configuration(tmp_path):
+    RunCheckpoint(str(tmp_path), 'run').save('Tree', 'config-a', fitted(), 0.5)
+
+    run = RunCheckpoint(str(tmp_path), 'run')
+    model, fit_seconds = run.load('Tree', 'config-a', n_features=3)
+    assert fit_seconds == 0.5
+    assert np.array_equal(model.predict(X), fitted().predict(X))
+    assert run.load('Tree', 'config-b') is None
+    assert run.load('Forest', 'config-a') is None
+    assert run.report()['resumed'] == ['Tree']
+
+
+def test_model_with_other_feature_count_is_not_restored(tmp_path):
+    RunCheckpoint(str(tmp_path), 'run').save('Tree', 'config-a', fitted(), 0.5)
+    assert RunCheckpoint(str(tmp_path), 'run').load('Tree', 'config-a', n_features=4) is None
+
+
+def test_config_key_covers_params_representation_and_matrix():
+    tree = DecisionTreeClassifier(max_depth=3)
+    key = model_config_key(tree, 'scaled', 'abc')
+    assert key == model_config_key(DecisionTreeClassifier(max_depth=3), 'scaled', 'abc')
+    assert key != model_config_key(DecisionTreeClassifier(max_depth=4), 'scaled', 'abc')
+    assert key != model_config_key(tree, 'pca', 'abc')
+    assert key != model_config_key(tree, 'scaled', 'abd')
+
+
+def test_alternating_configurations_keep_each_others_checkpoints(tmp_path):
+    run = RunCheckpoint(str(tmp_path), 'run')
+    run.save('Tree', 'sparse', fitted(), 1.0)
+    run.save('Tree', 'dense', fitted(), 2.0)
+    run.save_metrics('Tree', 'sparse', {'accuracy': 0.9})
+
+    again = RunCheckpoint(str(tmp_path), 'run')
+    assert again.load('Tree', 'sparse')[1] == 1.0
+    assert again.load('Tree', 'dense')[1] == 2.0
+    assert manifest(again)['models']['Tree']['sparse']['metrics'] == {'accuracy': 0.9}
+    assert 'metrics' not in manifest(again)['models']['Tree']['dense']
+
+
+def test_oldest_configurations_beyond_max_configs_are_dropped(tmp_path):
+    run = RunCheckpoint(str(tmp_path), 'run', max_configs=2)
+    for key in ('first', 'second', 'third'):
+        run.save('Tree', key, fitted(), 1.0)
+    run.save_metrics('Tree', 'first', {'accuracy': 1.0})
+
+    entries = manifest(run)['models']['Tree']
+    assert sorted(entries) == ['second', 'third']
+    artifacts = sorted(name for name in os.listdir(run.run_dir) if name.endswith('.joblib'))
+    assert artifacts == sorted(entry['artifact'] for entry in entries.values())
+    assert run.load('Tree', 'first') is None
+
+
+def test_manifest_in_an_older_layout_is_ignored(tmp_path):
+    run = RunCheckpoint(str(tmp_path), 'run')
+    with open(os.path.join(run.run_dir, 'manifest.json'), 'w') as f:
+        json.dump({'models': {'Tree': {'config': 'config-a', 'artifact': 'missing.joblib', 'fit_seconds': 1.0}}}, f)
+    assert RunCheckpoint(str(tmp_path), 'run').load('Tree', 'config-a') is None
+
+
+def save_models(base_dir, prefix, n):
+    run = RunCheckpoint(base_dir, 'run')
+    for i in range(n):
+        run.save(f'{prefix}-{i}', 'config', fitted(), 0.0)
+        run.save_metrics(f'{prefix}-{i}', 'config', {'accuracy': 1.0})
+
+
+def test_concurrent_threads_merge_their_entries(tmp_path):
+    threads = [threading.Thread(target=save_models, args=(str(tmp_path), f'thread{t}', 10)) for t in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    models = manifest(RunCheckpoint(str(tmp_path), 'run'))['models']
+    assert len(models) == 40
+    assert all('metrics' in entries['config'] for entries in models.values())
+    assert not [name for name in os.listdir(tmp_path / 'run') if name.endswith('.tmp')]
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork')
+def test_concurrent_processes_merge_their_entries(tmp_path):
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=save_models, args=(str(tmp_path), f'process{p}', 10)) for p in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+    models = manifest(RunCheckpoint(str(tmp_path), 'run'))['models']
+    assert len(models) == 30
+    assert all('metrics' in entries['config'] for entries in models.values())
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+from sklearn.metrics import (accuracy_score, confusion_matrix, f1_score, precision_score, recall_score,
+                             roc_auc_score)
+
+from evaluation import (METRIC_NAMES, _resample_counts, binary_auc, bootstrap_metrics, confusion_matrix_counts,
+                        evaluate_predictions, rank_models)
+
+
+def random_case(seed, n_classes):
+    """Labels, predictions and coarse (heavily tied) probabilities for `n_classes` classes"""
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(30, 200))
+    y = np.concatenate([np.arange(n_classes), rng.integers(0, n_classes, n - n_classes)])
+    proba = np.round(rng.dirichlet(np.ones(n_classes), n), 1) + 1e-3
+    proba /= proba.sum(axis=1, keepdims=True)
+    pred = proba.argmax(axis=1) if seed % 2 else rng.integers(0, n_classes, n)
+    return y, pred, proba
+
+
+@pytest.mark.parametrize('n_classes', [2, 3, 5])
+@pytest.mark.parametrize('seed', range(10))
+def test_metrics_match_sklearn(seed, n_classes):
+    y, pred, proba = random_case(seed, n_classes)
+    metrics = evaluate_predictions(y, pred, proba, np.arange(n_classes))
+    expected = {
+        'accuracy': accuracy_score(y, pred),
+        'precision': precision_score(y, pred, average='weighted', zero_division=0),
+        'recall': recall_score(y, pred, average='weighted', zero_division=0),
+        'f1_score': f1_score(y, pred, average='weighted', zero_division=0),
+        'roc_auc': roc_auc_score(y, proba[:, 1] if n_classes == 2 else proba, multi_class='ovr', average='weighted')
+    }
+    for metric, value in expected.items():
+        assert metrics[metric] == pytest.approx(value, abs=1e-12), metric
+    assert metrics['confusion_matrix'] == confusion_matrix(y, pred, labels=np.unique(np.concatenate([y, pred]))).tolist()
+
+
+def test_string_labels_and_predicted_label_missing_from_truth():
+    y = np.array(['a', 'a', 'b', 'b'])
+    pred = np.array(['a', 'c', 'b', 'b'])
+    metrics = evaluate_predictions(y, pred)
+    assert metrics['labels'] == ['a', 'b', 'c']
+    assert metrics['per_class']['c'] == {'precision': 0.0, 'recall': 0.0, 'f1_score': 0.0, 'roc_auc': None, 'support': 0}
+    assert metrics['precision'] == pytest.approx(precision_score(y, pred, average='weighted', zero_division=0))
+    assert metrics['roc_auc'] == 0.0
+
+
+def test_confusion_matrix_counts_matches_sklearn():
+    rng = np.random.default_rng(0)
+    true_idx, pred_idx = rng.integers(0, 4, 500), rng.integers(0, 4, 500)
+    assert np.array_equal(confusion_matrix_counts(true_idx, pred_idx, 4), confusion_matrix(true_idx, pred_idx, labels=range(4)))
+
+
+def test_binary_auc_averages_tied_ranks_and_needs_both_classes():
+    scores = np.array([0.1, 0.4, 0.4, 0.4, 0.8, 0.9])
+    positives = np.array([False, True, False, True, False, True])
+    assert binary_auc(scores, positives) == pytest.approx(roc_auc_score(positives, scores))
+    assert binary_auc(scores, np.ones(6, dtype=bool)) is None
+
+
+@pytest.mark.parametrize('n_classes', [2, 4])
+def test_bootstrap_samples_equal_metrics_of_the_resampled_rows(n_classes):
+    y, pred, proba = random_case(3, n_classes)
+    samples = bootstrap_metrics(y, pred, proba, np.arange(n_classes), n_resamples=20, random_state=7)
+    counts = next(_resample_counts(len(y), 20, random_state=7)).astype(int)
+    for i in range(20):
+        rows = np.repeat(np.arange(len(y)), counts[i])
+        expected = evaluate_predictions(y[rows], pred[rows], proba[rows], np.arange(n_classes))
+        for metric in METRIC_NAMES:
+            assert samples[metric][i] == pytest.approx(expected[metric], abs=1e-12), (i, metric)
+
+
+def test_bootstrap_is_paired_and_chunking_does_not_change_it():
+    y, pred, proba = random_case(5, 3)
+    whole = bootstrap_metrics(y, pred, proba, np.arange(3), n_resamples=50)
+    assert all(np.array_equal(whole[metric], bootstrap_metrics(y, pred, proba, np.arange(3), n_resamples=50)[metric])
+               for metric in METRIC_NAMES)
+    first = next(_resample_counts(len(y), 50, max_cells=len(y) * 50))
+    chunks = np.concatenate(list(_resample_counts(len(y), 50, max_cells=len(y) * 50)))
+    assert np.array_equal(first, chunks)
+    assert all((counts.sum(axis=1) == len(y)).all() for counts in _resample_counts(len(y), 50, max_cells=len(y) * 7))
+
+
+def test_rank_models_ties_indistinguishable_models():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, 400)
+    # Equally accurate models with errors on different rows, and one much worse
+    predictions = {
+        'strong': np.where(rng.random(400) < 0.9, y, 1 - y),
+        'strong_too': np.where(rng.random(400) < 0.9, y, 1 - y),
+        'weak': np.where(rng.random(400) < 0.6, y, 1 - y)
+    }
+    results = {name: evaluate_predictions(y, pred) for name, pred in predictions.items()}
+    samples = {name: bootstrap_metrics(y, pred, n_resamples=500) for name, pred in predictions.items()}
+    ordered, tiers = rank_models(results, samples)
+    assert ordered[-1] == 'weak'
+    assert tiers == {'strong': 1, 'strong_too': 1, 'weak': 2}
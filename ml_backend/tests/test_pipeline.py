@@ -0,0 +1,211 @@
+import threading
+import time
+
+from pipeline import Pipeline
+
+
+def counting_pipeline(calls, **options):
+    """Pipeline of two stages, `double` depending on `load`, recording each computation in `calls`"""
+    pipeline = Pipeline(**options)
+
+    @pipeline.stage('load', params=('value',))
+    def load(context, value):
+        calls.append(('load', value))
+        return [value]
+
+    @pipeline.stage('double', deps=('load',), params=('factor',))
+    def double(context, loaded, factor):
+        calls.append(('double', factor))
+        return [item * factor for item in loaded]
+
+    return pipeline
+
+
+def statuses(run):
+    return {entry['stage']: entry['status'] for entry in run.report}
+
+
+class CountingEvent(threading.Event):
+    """Event counting the threads that have started waiting on it"""
+
+    def __init__(self):
+        super().__init__()
+        self.waiters = 0
+
+    def wait(self, timeout=None):
+        self.waiters += 1
+        return super().wait(timeout)
+
+
+def watch_flight(pipeline):
+    """Counting event of the single computation in flight, to be called before any other run joins it"""
+    flight = next(iter(pipeline.in_flight.values()))
+    flight.done = CountingEvent()
+    return flight.done
+
+
+def wait_for_waiters(event, n):
+    deadline = time.monotonic() + 5
+    while event.waiters < n and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert event.waiters == n
+
+
+def test_outputs_are_memoized_by_stage_params():
+    calls = []
+    pipeline = counting_pipeline(calls)
+    first = pipeline.start({'value': 3, 'factor': 2})
+    assert first.get('double') == [6]
+    assert statuses(first) == {'load': 'miss', 'double': 'miss'}
+
+    again = pipeline.start({'value': 3, 'factor': 2})
+    assert again.get('double') == [6]
+    assert statuses(again) == {'load': 'hit', 'double': 'hit'}
+    assert len(calls) == 2
+
+
+def test_changed_param_reruns_only_downstream_stages():
+    calls = []
+    pipeline = counting_pipeline(calls)
+    pipeline.start({'value': 3, 'factor': 2}).get('double')
+    run = pipeline.start({'value': 3, 'factor': 5})
+    assert run.get('double') == [15]
+    assert statuses(run) == {'load': 'hit', 'double': 'miss'}
+    assert calls == [('load', 3), ('double', 2), ('double', 5)]
+
+
+def test_bytes_param_is_keyed_by_content():
+    calls = []
+    pipeline = counting_pipeline(calls)
+    assert pipeline.start({'value': b'abc', 'factor': 1}).key('load') == pipeline.start({'value': b'abc', 'factor': 9}).key('load')
+    assert pipeline.start({'value': b'abc'}).key('load') != pipeline.start({'value': b'abd'}).key('load')
+
+
+def test_least_recently_used_entries_beyond_max_entries_are_dropped():
+    calls = []
+    pipeline = counting_pipeline(calls, max_entries=2)
+    for value in (1, 2, 3):
+        pipeline.start({'value': value}).get('load')
+    assert [output for output in pipeline.cache.values()] == [[2], [3]]
+    run = pipeline.start({'value': 1})
+    run.get('load')
+    assert statuses(run) == {'load': 'miss'}
+
+
+def test_entries_beyond_max_bytes_are_dropped_but_never_the_newest():
+    calls = []
+    pipeline = counting_pipeline(calls, max_bytes=250, sizeof=lambda output: 100 * len(output))
+    pipeline.start({'value': 1}).get('load')
+    pipeline.start({'value': 2}).get('load')
+    assert pipeline.total_bytes == 200
+
+    pipeline.start({'value': 3}).get('load')
+    assert pipeline.total_bytes == 200
+    assert [output for output in pipeline.cache.values()] == [[2], [3]]
+
+    # An output larger than the whole budget is still cached, alone
+    pipeline.start({'value': 3, 'factor': 4}).get('double')
+    pipeline.sizeof = lambda output: 1000
+    pipeline.start({'value': 3, 'factor': 5}).get('double')
+    assert list(pipeline.cache.values()) == [[15]]
+    assert pipeline.total_bytes == 1000
+
+
+def test_hit_refreshes_recency():
+    calls = []
+    pipeline = counting_pipeline(calls, max_entries=2)
+    pipeline.start({'value': 1}).get('load')
+    pipeline.start({'value': 2}).get('load')
+    pipeline.start({'value': 1}).get('load')
+    pipeline.start({'value': 3}).get('load')
+    assert [output for output in pipeline.cache.values()] == [[1], [3]]
+
+
+def test_concurrent_runs_share_one_computation():
+    pipeline = Pipeline()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    @pipeline.stage('slow', params=('value',))
+    def slow(context, value):
+        calls.append(value)
+        started.set()
+        release.wait(5)
+        return value * 2
+
+    runs = [pipeline.start({'value': 21}) for _ in range(4)]
+    outputs = []
+    threads = [threading.Thread(target=lambda run=run: outputs.append(run.get('slow'))) for run in runs]
+    threads[0].start()
+    assert started.wait(5)
+    done = watch_flight(pipeline)
+    for thread in threads[1:]:
+        thread.start()
+    wait_for_waiters(done, 3)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert outputs == [42] * 4
+    assert calls == [21]
+    assert sorted(statuses(run)['slow'] for run in runs) == ['miss', 'shared', 'shared', 'shared']
+
+
+def test_guard_is_entered_only_by_the_computing_run():
+    pipeline = Pipeline()
+    entered = []
+
+    @pipeline.stage('value', params=('value',))
+    def value(context, value):
+        return value
+
+    class Guard:
+        def __enter__(self):
+            entered.append(True)
+
+        def __exit__(self, *exc):
+            return False
+
+    pipeline.start({'value': 1}).get('value', guard=Guard)
+    pipeline.start({'value': 1}).get('value', guard=Guard)
+    assert entered == [True]
+
+
+def test_error_reaches_waiting_runs_and_is_not_cached():
+    pipeline = Pipeline()
+    started = threading.Event()
+    release = threading.Event()
+    attempts = []
+
+    @pipeline.stage('flaky')
+    def flaky(context):
+        attempts.append(True)
+        if len(attempts) == 1:
+            started.set()
+            release.wait(5)
+            raise RuntimeError('first attempt fails')
+        return 'ok'
+
+    errors = []
+
+    def resolve():
+        try:
+            pipeline.start({}).get('flaky')
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=resolve)
+    leader.start()
+    assert started.wait(5)
+    done = watch_flight(pipeline)
+    follower = threading.Thread(target=resolve)
+    follower.start()
+    wait_for_waiters(done, 1)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert errors == ['first attempt fails'] * 2
+    assert pipeline.start({}).get('flaky') == 'ok'
+    assert pipeline.in_flight == {}
@@ -0,0 +1,43 @@
+import gzip
+import json
+
+import pytest
+from flask import Flask
+
+from responses import compress_response, conditional_json
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.after_request(compress_response)
+    built = []
+
+    @app.route('/payload')
+    def payload():
+        return conditional_json('abc123', lambda: built.append(True) or {'values': list(range(500))})
+
+    app.built = built
+    return app.test_client()
+
+
+def test_etag_is_weak_and_survives_compression(client):
+    response = client.get('/payload', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['ETag'] == 'W/"abc123"'
+    assert json.loads(gzip.decompress(response.data))['values'][-1] == 499
+
+
+@pytest.mark.parametrize('if_none_match', ['W/"abc123"', '"abc123"', '"other", W/"abc123"'])
+def test_matching_validator_gets_304_without_building_the_payload(client, if_none_match):
+    response = client.get('/payload', headers={'If-None-Match': if_none_match})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == 'W/"abc123"'
+    assert client.application.built == []
+
+
+def test_other_validator_gets_the_body(client):
+    response = client.get('/payload', headers={'If-None-Match': 'W/"stale"'})
+    assert response.status_code == 200
+    assert client.application.built == [True]
@@ -0,0 +1,124 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import sessions
+from sessions import SessionStore, deep_nbytes
+
+IDS = [f'session-{i}' for i in range(10)]
+
+
+def sized_store(**options):
+    """Store measuring each state as its `nbytes` key"""
+    return SessionStore(sizeof=lambda state: state['nbytes'], **options)
+
+
+def test_least_recently_used_sessions_beyond_max_sessions_are_evicted():
+    store = sized_store(max_sessions=2)
+    store.put(IDS[0], {'nbytes': 1})
+    store.put(IDS[1], {'nbytes': 1})
+    assert store.get(IDS[0]) is not None
+    store.put(IDS[2], {'nbytes': 1})
+
+    assert store.get(IDS[1]) is None
+    assert store.get(IDS[0]) is not None and store.get(IDS[2]) is not None
+    assert store.stats()['evictions']['count'] == 1
+
+
+def test_sessions_beyond_max_bytes_are_evicted_but_never_the_newest():
+    store = sized_store(max_bytes=100)
+    store.put(IDS[0], {'nbytes': 40})
+    store.put(IDS[1], {'nbytes': 40})
+    store.put(IDS[2], {'nbytes': 40})
+    assert list(store.entries) == [IDS[1], IDS[2]]
+    assert store.total_bytes == 80
+
+    store.put(IDS[3], {'nbytes': 500})
+    assert list(store.entries) == [IDS[3]]
+    assert store.total_bytes == 500
+    assert store.stats()['evictions']['memory'] == 3
+
+
+def test_replacing_a_session_updates_its_size():
+    store = sized_store()
+    store.put(IDS[0], {'nbytes': 40})
+    store.put(IDS[0], {'nbytes': 10})
+    assert store.total_bytes == 10
+    assert store.pop(IDS[0]) == {'nbytes': 10}
+    assert store.total_bytes == 0
+
+
+def test_idle_sessions_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(sessions.time, 'monotonic', lambda: now[0])
+    store = sized_store(ttl_seconds=60)
+    store.put(IDS[0], {'nbytes': 1})
+    store.put(IDS[1], {'nbytes': 1})
+    now[0] += 45
+    assert store.get(IDS[1]) is not None
+    now[0] += 30
+    assert store.get(IDS[0]) is None
+    assert store.get(IDS[1]) is not None
+    assert store.stats()['evictions']['ttl'] == 1
+
+
+@pytest.mark.parametrize('session_id', [None, '', 'short', '../../etc/passwd', 'a' * 65, 'spaces in id'])
+def test_invalid_ids_name_no_session(session_id):
+    assert not SessionStore.valid_id(session_id)
+    assert SessionStore().get(session_id) is None
+
+
+def test_sessions_are_shared_through_the_directory(tmp_path):
+    writer = SessionStore(directory=str(tmp_path))
+    reader = SessionStore(directory=str(tmp_path))
+    writer.put(IDS[0], {'value': 1})
+    assert reader.get(IDS[0]) == {'value': 1}
+
+    # A session replaced by another process is reloaded, one it removed is gone
+    writer.put(IDS[0], {'value': 2})
+    assert reader.get(IDS[0]) == {'value': 2}
+    writer.pop(IDS[0])
+    assert reader.get(IDS[0]) is None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_session_files_are_held_to_the_count_limit(tmp_path):
+    store = SessionStore(directory=str(tmp_path), max_sessions=2)
+    for i in range(3):
+        store.put(IDS[i], {'value': i})
+        # File modification times order the files; keep them apart on coarse clocks
+        stamp = time.time() - 10 + i
+        os.utime(store._path(IDS[i]), (stamp, stamp))
+    store.put(IDS[3], {'value': 3})
+    assert sorted(os.listdir(tmp_path)) == [f'{IDS[2]}.joblib', f'{IDS[3]}.joblib']
+    assert store.stats()['stored_sessions'] == 2
+
+
+def test_deep_nbytes_counts_arrays_frames_and_attributes_once():
+    array = np.zeros(1000)
+    frame = pd.DataFrame({'a': np.zeros(500)})
+
+    class Holder:
+        pass
+
+    holder = Holder()
+    holder.array = array
+    holder.same_array = array
+    holder.frame = frame
+    total = deep_nbytes(holder)
+    assert array.nbytes + 500 * 8 <= total < array.nbytes + 500 * 8 + 4096
+    assert deep_nbytes(holder, exclude=(array,)) < total - array.nbytes + 1
+
+
+def test_app_sessions_are_measured_by_what_they_hold_in_memory():
+    import app as backend
+
+    system = backend.HybridMLSystem()
+    empty = backend.sessions.sizeof(system)
+    # Attributes left out of the pickled state still take memory while the session is cached
+    system.feature_views = np.zeros(100_000)
+    system.results = {'model': {'predictions': np.zeros(50_000)}}
+    assert backend.sessions.sizeof(system) >= empty + 150_000 * 8
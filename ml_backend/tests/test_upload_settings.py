@@ -0,0 +1,36 @@
+import io
+
+import pytest
+
+import app as backend
+
+CSV = b'a,b,target\n' + b''.join(f'{i},{i % 3},{i % 2}\n'.encode() for i in range(30))
+
+
+def upload(**form):
+    client = backend.app.test_client()
+    return client.post('/api/upload-dataset', data={'file': (io.BytesIO(CSV), 'data.csv'), **form})
+
+
+@pytest.mark.parametrize('field, value', [
+    ('forest_mode', 'adaptve'),
+    ('nn_mode', 'early-stopping'),
+    ('knn_mode', 'swep'),
+    ('lr_mode', 'paths'),
+    ('feature_selection', 'nonexistent'),
+    ('feature_selection', 'forests'),
+    ('pca_mode', 'on'),
+])
+def test_unknown_mode_is_rejected_before_training(field, value):
+    response = upload(**{field: value})
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith(f'Unknown {field}: {value}')
+
+
+@pytest.mark.parametrize('form', [
+    {'pca_variance': '1.5'},
+    {'pca_variance': 'most'},
+    {'pca_components': '0'},
+])
+def test_bad_pca_size_is_rejected(form):
+    assert upload(**form).status_code == 400
@@ -0,0 +1,280 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import wait
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.base import clone
+from sklearn.model_selection import ParameterSampler, train_test_split
+
+from parallel import get_pool, pool_workers, fit_and_predict
+
+logger = logging.getLogger(__name__)
+
+# Search spaces for the model zoo, sampled randomly by successive halving
+SEARCH_SPACES = {
+    'Random Forest': {
+        'n_estimators': [50, 100, 200, 400],
+        'max_depth': [None, 6, 12, 24],
+        'min_samples_leaf': [1, 2, 4],
+        'max_features': ['sqrt', 'log2', None]
+    },
+    'XGBoost': {
+        'n_estimators': [50, 100, 200, 400],
+        'max_depth': [3, 4, 6, 8],
+        'learning_rate': [0.03, 0.1, 0.3],
+        'subsample': [0.7, 0.85, 1.0],
+        'colsample_bytree': [0.7, 0.85, 1.0]
+    },
+    'Neural Network': {
+        'hidden_layer_sizes': [(50,), (100,), (100, 50), (200, 100)],
+        'alpha': [1e-5, 1e-4, 1e-3, 1e-2],
+        'learning_rate_init': [1e-3, 3e-3, 1e-2]
+    },
+    'Support Vector Machine': {
+        'C': [0.1, 0.3, 1.0, 3.0, 10.0, 30.0],
+        'gamma': ['scale', 0.01, 0.1, 1.0]
+    },
+    'Logistic Regression': {
+        'C': [0.01, 0.1, 0.3, 1.0, 3.0, 10.0, 100.0]
+    },
+    'Decision Tree': {
+        'max_depth': [None, 4, 8, 16],
+        'min_samples_leaf': [1, 2, 5, 10],
+        'criterion': ['gini', 'entropy']
+    },
+    'K-Nearest Neighbors': {
+        'n_neighbors': [1, 3, 5, 7, 11, 15, 21],
+        'weights': ['uniform', 'distance']
+    },
+    'Gradient Boosting': {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [2, 3, 5],
+        'learning_rate': [0.03, 0.1, 0.3],
+        'subsample': [0.7, 1.0]
+    }
+}
+
+# Search spaces for the scalable substitutes picked by build_models on large datasets
+VARIANT_SEARCH_SPACES = {
+    'hist_gradient_boosting': {
+        'max_iter': [100, 200, 400],
+        'learning_rate': [0.03, 0.1, 0.3],
+        'max_leaf_nodes': [15, 31, 63],
+        'l2_regularization': [0.0, 0.1, 1.0]
+    },
+    'linear_svm': {
+        'estimator__C': [0.01, 0.1, 1.0, 10.0]
+    },
+    'k_sweep': {
+        'k_max': [15, 25, 50]
+    },
+    'regularization_path': {},
+    'nystroem_svm': {
+        'nystroem__gamma': [None, 0.01, 0.1, 1.0],
+        'calibratedclassifiercv__estimator__C': [0.1, 1.0, 10.0]
+    }
+}
+
+
+def search_space(name, variant='default'):
+    """Search space for a model, following the variant build_models selected"""
+    if variant in VARIANT_SEARCH_SPACES:
+        return VARIANT_SEARCH_SPACES[variant]
+    return SEARCH_SPACES.get(name, {})
+
+
+def dataset_fingerprint(X, y):
+    """Stable content hash of a feature matrix and its target"""
+    digest = hashlib.sha1()
+    if sp.issparse(X):
+        X = sp.csr_matrix(X)
+        arrays = (X.data, X.indices, X.indptr, np.asarray(X.shape), np.ascontiguousarray(y))
+    else:
+        arrays = (np.ascontiguousarray(X), np.ascontiguousarray(y))
+    for values in arrays:
+        digest.update(str((values.shape, values.dtype.str)).encode())
+        digest.update(values.tobytes() if values.dtype != object else str(values.tolist()).encode())
+    return digest.hexdigest()
+
+
+class TrialCache:
+    """Validation scores of tuning trials, keyed by dataset fingerprint.
+
+    Scores are held in memory and mirrored to one JSON file per dataset, so a
+    dataset tuned once is answered from cache after a restart as well.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        self.entries = {}
+
+    def _path(self, fingerprint):
+        return os.path.join(self.cache_dir, f'{fingerprint}.json')
+
+    def _load(self, fingerprint):
+        if fingerprint not in self.entries:
+            self.entries[fingerprint] = {}
+            if self.cache_dir and os.path.exists(self._path(fingerprint)):
+                with open(self._path(fingerprint)) as f:
+                    self.entries[fingerprint] = json.load(f)
+        return self.entries[fingerprint]
+
+    @staticmethod
+    def trial_key(model_name, params, n_rows):
+        return json.dumps([model_name, params, n_rows], sort_keys=True, default=str)
+
+    def get(self, fingerprint, key):
+        return self._load(fingerprint).get(key)
+
+    def put(self, fingerprint, key, score):
+        self._load(fingerprint)[key] = score
+
+    def flush(self, fingerprint):
+        if self.cache_dir and fingerprint in self.entries:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write then rename, so concurrent sessions never read a partly written file
+            path = self._path(fingerprint)
+            partial = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(partial, 'w') as f:
+                json.dump(self.entries[fingerprint], f)
+            os.replace(partial, path)
+
+
+def successive_halving(name, estimator, X, y, cache, budget_seconds=30, n_candidates=16, eta=3, random_state=42, space=None):
+    """Tune one estimator by successive halving over training-row budgets.
+
+    Every round fits the surviving candidates on a growing subsample in the
+    shared process pool and keeps the best 1/eta of them. Trials are
+    submitted a pool-full at a time, and only while the slowest fit seen so
+    far, scaled to the round's rows, would still finish within the
+    wall-clock budget with time left for refitting on all rows. The winner
+    is the best candidate of the last round in which every candidate was
+    scored; a round cut short by the budget is discarded. The default
+    configuration is a candidate in every round, so `default_score` is
+    measured on the same rows as `best_score`, and it wins ties. Failed
+    trials are logged and not cached.
+    """
+    started = time.time()
+    deadline = started + budget_seconds
+    X = X if sp.issparse(X) else np.asarray(X)
+    y = np.asarray(y)
+    fingerprint = dataset_fingerprint(X, y)
+
+    # One validation split and one row order shared by every trial
+    _, class_counts = np.unique(y, return_counts=True)
+    stratify = y if class_counts.min() >= 2 else None
+    train_idx, val_idx = train_test_split(np.arange(len(y)), test_size=0.25, random_state=random_state, stratify=stratify)
+    train_idx = np.random.default_rng(random_state).permutation(train_idx)
+
+    space = SEARCH_SPACES.get(name, {}) if space is None else space
+    candidates = [{}] + list(ParameterSampler(space, n_iter=n_candidates - 1, random_state=random_state)) if space else [{}]
+
+    n_rounds = max(1, math.ceil(math.log(len(candidates), eta)))
+    min_rows = max(len(np.unique(y)) * 5, len(train_idx) // eta ** (n_rounds - 1))
+
+    pool = get_pool()
+    slots = pool_workers()
+    # Scores of the last complete round, and the candidates and rows they were scored on
+    scores = {}
+    scored_candidates = []
+    scored_rows = None
+    default_score = None
+    # Slowest fit of the latest batch and the rows it was fitted on
+    slowest_fit = None
+
+    def fit_estimate(rows):
+        return slowest_fit[0] * rows / slowest_fit[1] if slowest_fit else 0.0
+
+    trials = 0
+    failures = 0
+    cache_hits = 0
+    rounds_completed = 0
+    budget_exhausted = False
+    for round_index in range(n_rounds):
+        last_round = round_index == n_rounds - 1
+        n_rows = len(train_idx) if last_round else min(len(train_idx), min_rows * eta ** round_index)
+        round_scores = {}
+        queue = []
+        for i, params in enumerate(candidates):
+            key = cache.trial_key(f'{name} ({type(estimator).__name__})', params, n_rows)
+            cached = cache.get(fingerprint, key)
+            if cached is not None:
+                round_scores[i] = cached
+                cache_hits += 1
+            else:
+                queue.append((i, key, params))
+
+        cut_short = False
+        while queue and not cut_short:
+            remaining = deadline - time.time()
+            if remaining <= 0 or fit_estimate(n_rows) + fit_estimate(len(y)) > remaining:
+                cut_short = True
+                break
+            batch, queue = queue[:slots], queue[slots:]
+            pending = {
+                pool.submit(fit_and_predict, clone(estimator).set_params(**params), X, y, train_idx[:n_rows], val_idx, scale=False): (i, key, params)
+                for i, key, params in batch
+            }
+            done, not_done = wait(pending, timeout=max(0.0, deadline - time.time()))
+            batch_seconds = []
+            for future in done:
+                i, key, params = pending[future]
+                try:
+                    result = future.result()
+                except Exception:
+                    logger.warning('Tuning trial of %s with %s failed', name, params, exc_info=True)
+                    failures += 1
+                    continue
+                round_scores[i] = float(np.mean(result['predictions'] == y[val_idx]))
+                cache.put(fingerprint, key, round_scores[i])
+                batch_seconds.append(result['fit_seconds'])
+                trials += 1
+            if batch_seconds:
+                slowest_fit = (max(batch_seconds), n_rows)
+            # Fits already running cannot be stopped; the round is incomplete either way
+            for future in not_done:
+                future.cancel()
+            cut_short = bool(not_done)
+
+        if cut_short:
+            budget_exhausted = True
+            break
+        if not round_scores:
+            break
+        scores, scored_candidates, scored_rows = round_scores, candidates, n_rows
+        default_score = round_scores.get(0) if candidates[0] == {} else None
+        rounds_completed += 1
+        if last_round:
+            break
+        if time.time() >= deadline:
+            budget_exhausted = True
+            break
+
+        # Keep the best 1/eta of the candidates for the next, larger round, and the default to compare them with
+        best_first = sorted(round_scores, key=round_scores.get, reverse=True)[:max(1, len(candidates) // eta)]
+        survivors = ([0] if candidates[0] == {} else []) + [i for i in best_first if i != 0]
+        candidates = [candidates[i] for i in survivors]
+
+    cache.flush(fingerprint)
+    best = max(scores, key=lambda i: (scores[i], scored_candidates[i] == {})) if scores else None
+    # Only a winner that beat the default on the same rows is worth refitting
+    improved = best is not None and scored_candidates[best] != {} and default_score is not None
+    return {
+        'best_params': scored_candidates[best] if best is not None else {},
+        'best_score': scores[best] if best is not None else None,
+        'best_score_rows': scored_rows,
+        'refit_estimate': fit_estimate(len(y)) if improved else 0.0,
+        'default_score': default_score,
+        'trials': trials,
+        'failed_trials': failures,
+        'cache_hits': cache_hits,
+        'rounds': rounds_completed,
+        'budget_exhausted': budget_exhausted,
+        'elapsed': time.time() - started
+    }
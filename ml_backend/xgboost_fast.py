@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import xgboost as xgb
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.model_selection import train_test_split
+
+
+class FastXGBClassifier(ClassifierMixin, BaseEstimator):
+    """XGBoost on the native API: hist trees, native categoricals and early stopping.
+
+    Takes unscaled features (trees do not need scaling) and keeps the
+    label-encoded categorical columns as pandas categories so XGBoost can
+    split on them natively. CSR input (one-hot or hashed features) is passed
+    to XGBoost as is. The training matrix is quantized once into a
+    QuantileDMatrix, the validation matrix reuses its bin edges, and boosting
+    stops once the validation loss has not improved for early_stopping_rounds.
+    """
+
+    def __init__(self, n_estimators=300, learning_rate=0.3, max_depth=6, max_bin=256,
+                 subsample=1.0, colsample_bytree=1.0, early_stopping_rounds=10,
+                 validation_fraction=0.15, categorical_columns=None, random_state=42, n_jobs=-1):
+        self.n_estimators = n_estimators
+        self.learning_rate = learning_rate
+        self.max_depth = max_depth
+        self.max_bin = max_bin
+        self.subsample = subsample
+        self.colsample_bytree = colsample_bytree
+        self.early_stopping_rounds = early_stopping_rounds
+        self.validation_fraction = validation_fraction
+        self.categorical_columns = categorical_columns
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+
+    def _frame(self, X):
+        """Features as a DataFrame with the categorical columns typed as categories"""
+        if sp.issparse(X):
+            return sp.csr_matrix(X)
+        frame = X if isinstance(X, pd.DataFrame) else pd.DataFrame(np.asarray(X), columns=self.feature_names_)
+        categories = getattr(self, 'categories_', {})
+        if categories:
+            frame = frame.copy()
+            for col, levels in categories.items():
+                frame[col] = pd.Categorical(frame[col], categories=levels)
+        return frame
+
+    def fit(self, X, y):
+        y = np.asarray(y)
+        self.classes_, y_encoded = np.unique(y, return_inverse=True)
+        self.feature_names_ = [str(col) for col in X.columns] if isinstance(X, pd.DataFrame) else [f'f{i}' for i in range(np.shape(X)[1])]
+
+        # Category levels are fixed at fit time so train and test share one coding
+        self.categories_ = {}
+        if isinstance(X, pd.DataFrame):
+            for col in self.categorical_columns or []:
+                if col in X.columns:
+                    self.categories_[col] = np.sort(X[col].dropna().unique())
+        frame = self._frame(X)
+
+        n_classes = len(self.classes_)
+        params = {
+            'tree_method': 'hist',
+            'max_bin': self.max_bin,
+            'eta': self.learning_rate,
+            'max_depth': self.max_depth,
+            'subsample': self.subsample,
+            'colsample_bytree': self.colsample_bytree,
+            'seed': self.random_state,
+            'nthread': self.n_jobs if self.n_jobs and self.n_jobs > 0 else 0
+        }
+        if n_classes > 2:
+            params.update(objective='multi:softprob', num_class=n_classes, eval_metric='mlogloss')
+        else:
+            params.update(objective='binary:logistic', eval_metric='logloss')
+
+        # Hold out a validation split for early stopping when there is enough data
+        _, class_counts = np.unique(y_encoded, return_counts=True)
+        n_valid = int(len(y_encoded) * self.validation_fraction)
+        use_validation = self.early_stopping_rounds and n_valid >= n_classes and class_counts.min() >= 2
+        if use_validation:
+            train_idx, valid_idx = train_test_split(np.arange(len(y_encoded)), test_size=self.validation_fraction,
+                                                    random_state=self.random_state, stratify=y_encoded)
+            rows = frame if sp.issparse(frame) else frame.iloc
+            dtrain = xgb.QuantileDMatrix(rows[train_idx], y_encoded[train_idx], max_bin=self.max_bin, enable_categorical=True)
+            dvalid = xgb.QuantileDMatrix(rows[valid_idx], y_encoded[valid_idx], ref=dtrain, max_bin=self.max_bin, enable_categorical=True)
+            self.booster_ = xgb.train(params, dtrain, num_boost_round=self.n_estimators, evals=[(dvalid, 'validation')],
+                                      early_stopping_rounds=self.early_stopping_rounds, verbose_eval=False)
+            self.best_iteration_ = int(self.booster_.best_iteration)
+        else:
+            dtrain = xgb.QuantileDMatrix(frame, y_encoded, max_bin=self.max_bin, enable_categorical=True)
+            self.booster_ = xgb.train(params, dtrain, num_boost_round=min(self.n_estimators, 100))
+            self.best_iteration_ = self.booster_.num_boosted_rounds() - 1
+
+        return self
+
+    def predict_proba(self, X):
+        dmatrix = xgb.DMatrix(self._frame(X), enable_categorical=True)
+        proba = self.booster_.predict(dmatrix, iteration_range=(0, self.best_iteration_ + 1))
+        if proba.ndim == 1:
+            proba = np.column_stack([1 - proba, proba])
+        return proba
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
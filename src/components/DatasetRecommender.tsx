@@ -24,6 +24,7 @@ import {
   Activity
 } from 'lucide-react';
 import Plot from 'react-plotly.js';
+import { buildPerformanceFigure } from '@/lib/performanceFigure';
 
 interface ModelResult {
   name: string;
@@ -85,6 +86,7 @@ export function DatasetRecommender() {
   const [feedback, setFeedback] = useState<Feedback | null>(null);
   const [plotData, setPlotData] = useState<any>(null);
   const [top3Models, setTop3Models] = useState<string[]>([]);
+  const [sessionId, setSessionId] = useState<string | null>(null);
   const [error, setError] = useState<string | null>(null);
   const { toast } = useToast();
 
@@ -97,6 +99,10 @@ export function DatasetRecommender() {
     
     const formData = new FormData();
     formData.append('file', file);
+    if (sessionId) {
+      // Replace this browser's previous results instead of opening another server session
+      formData.append('session_id', sessionId);
+    }
     
     try {
       // Simulate progress updates
@@ -136,10 +142,11 @@ export function DatasetRecommender() {
         status: 'completed' as const
       }));
 
+      setSessionId(data.session_id);
       setModelResults(results);
       setDatasetInfo(data.dataset_info);
       setFeedback(data.feedback);
-      setPlotData(JSON.parse(data.plot_data));
+      setPlotData(buildPerformanceFigure(data.chart_data));
       setTop3Models(data.top_3_models);
       
       toast({
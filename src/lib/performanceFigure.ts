@@ -0,0 +1,65 @@
+export const METRICS = ['accuracy', 'precision', 'recall', 'f1_score', 'roc_auc'] as const;
+
+type Metric = typeof METRICS[number];
+
+export interface ChartData {
+  models: string[];
+  rank: number[];
+  metrics: Record<Metric, number[]>;
+  top_3: string[];
+  colors: string[];
+}
+
+// Plotly figure of the backend's compact chart data, laid out like the old server-built figure
+export function buildPerformanceFigure(chart: ChartData) {
+  const { models, metrics } = chart;
+  const domains = {
+    x: [[0, 0.28], [0.36, 0.64], [0.72, 1]],
+    y: [[0.55, 1], [0, 0.45]],
+  };
+  const axis = (n: number) => (n === 1 ? '' : String(n));
+
+  const data: any[] = [
+    { type: 'bar', x: models, y: metrics.accuracy, name: 'Accuracy', marker: { color: 'lightblue' }, xaxis: 'x', yaxis: 'y' },
+    {
+      type: 'scatter', mode: 'markers+text', x: metrics.precision, y: metrics.recall, text: models,
+      textposition: 'top center', marker: { size: 10, color: 'red' }, name: 'Precision vs Recall', xaxis: 'x2', yaxis: 'y2',
+    },
+    { type: 'bar', x: models, y: metrics.f1_score, name: 'F1-Score', marker: { color: 'lightgreen' }, xaxis: 'x3', yaxis: 'y3' },
+    { type: 'bar', x: models, y: metrics.roc_auc, name: 'ROC-AUC', marker: { color: 'orange' }, xaxis: 'x4', yaxis: 'y4' },
+    ...chart.top_3.map(name => {
+      const index = models.indexOf(name);
+      return {
+        type: 'scatterpolar', r: METRICS.map(metric => metrics[metric][index]), theta: [...METRICS], fill: 'toself',
+        name, line: { color: chart.colors[index] }, subplot: 'polar',
+      };
+    }),
+    {
+      type: 'bar', x: models, y: metrics.accuracy, name: 'Ranking', xaxis: 'x5', yaxis: 'y5',
+      marker: { color: models.map((_, i) => (i < 3 ? 'gold' : 'lightgray')) },
+    },
+  ];
+
+  const layout: any = {
+    height: 800,
+    title: { text: 'Machine Learning Model Performance Analysis' },
+    showlegend: true,
+    polar: { domain: { x: domains.x[1], y: domains.y[1] } },
+    annotations: [] as any[],
+  };
+  const cells = [[0, 0], [1, 0], [2, 0], [0, 1], [2, 1]];
+  cells.forEach(([col, row], i) => {
+    layout[`xaxis${axis(i + 1)}`] = { domain: domains.x[col], anchor: `y${axis(i + 1)}` };
+    layout[`yaxis${axis(i + 1)}`] = { domain: domains.y[row], anchor: `x${axis(i + 1)}` };
+  });
+  const titles = ['Accuracy Comparison', 'Precision vs Recall', 'F1-Score Distribution', 'ROC-AUC Scores', 'Overall Performance', 'Model Ranking'];
+  titles.forEach((text, i) => {
+    const [col, row] = [i % 3, Math.floor(i / 3)];
+    layout.annotations.push({
+      text, showarrow: false, xref: 'paper', yref: 'paper', xanchor: 'center', yanchor: 'bottom',
+      x: (domains.x[col][0] + domains.x[col][1]) / 2, y: domains.y[row][1],
+    });
+  });
+
+  return { data, layout };
+}
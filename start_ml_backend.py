@@ -8,21 +8,22 @@ import subprocess
 import sys
 import os
 import time
+from importlib.metadata import PackageNotFoundError, version
 
 def check_dependencies():
     """Check if required Python packages are installed"""
+    # Distribution metadata is read without importing the packages, which takes seconds for the ML stack
     required_packages = [
-        'flask', 'pandas', 'numpy', 'scikit-learn', 
-        'xgboost', 'tensorflow', 'matplotlib', 'seaborn', 
-        'plotly', 'scikit-plot', 'flask-cors'
+        'flask', 'flask-cors', 'pandas', 'numpy', 'scipy',
+        'scikit-learn', 'xgboost', 'plotly'
     ]
     
     missing_packages = []
     
     for package in required_packages:
         try:
-            __import__(package.replace('-', '_'))
-        except ImportError:
+            version(package)
+        except PackageNotFoundError:
             missing_packages.append(package)
     
     if missing_packages:
@@ -41,13 +42,16 @@ def start_backend():
     print("   - GET /api/get-dataset-info")
     print("   - GET /api/get-model-results")
     print("   - POST /api/train-ensemble")
+    print("   - GET /api/chart-data")
+    print("   - GET /api/plot-figure")
+    print("   - GET /api/health")
     print("\n" + "="*50)
     
     # Change to the ml_backend directory
     os.chdir('ml_backend')
     
-    # Start the Flask app
-    subprocess.run([sys.executable, 'app.py'])
+    # Start the Flask app; options such as --production --workers 4 are passed through
+    subprocess.run([sys.executable, 'app.py'] + sys.argv[1:])
 
 if __name__ == "__main__":
     print("🤖 AI EduPulse - ML Backend Service")
@@ -19,7 +19,7 @@ def test_backend_api():
     try:
         # Test 1: Check if backend is running
         print("1. Testing backend connectivity...")
-        response = requests.get(f"{base_url}/get-dataset-info", timeout=5)
+        response = requests.get(f"{base_url}/health", timeout=5)
         if response.status_code == 200:
             print("   ✅ Backend is running")
         else: